@@ -0,0 +1,95 @@
+"""
+Benchmark of bot startup time.
+It measures how long it takes to import run_bot module in a fresh interpreter
+and how long it takes from create_app call till the first update is processed.
+
+Usage: python benchmarks/bench_startup.py [--repeat N]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT_PATH = Path(os.path.dirname(os.path.abspath(__file__))).parent
+TABLES_FILE = ROOT_PATH / Path("tables_distribution") / Path("tables.csv")
+# token is never sent anywhere, it only has to pass aiogram format validation
+FAKE_TOKEN = "123456:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
+
+sys.path.insert(0, str(ROOT_PATH))
+
+
+def measure_import(repeat: int) -> list:
+    """
+    Import run_bot in a fresh interpreter, so nothing is cached between runs
+    :param repeat:
+    :return: list of timings in seconds
+    """
+    code = "import time; t = time.perf_counter(); import run_bot; print(time.perf_counter() - t)"
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_PATH,
+                                capture_output=True, text=True, check=True)
+        timings.append(float(result.stdout.strip()))
+    return timings
+
+
+async def first_update() -> float:
+    from aiogram import types
+    from aiogram.client.session.base import BaseSession
+
+    class NullSession(BaseSession):
+        # session which answers every request without network calls
+
+        async def make_request(self, bot, method, timeout=None):
+            return None
+
+        async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+            yield b""
+
+        async def close(self):
+            pass
+
+    import run_bot
+
+    start = time.perf_counter()
+    bot, ds = run_bot.create_app(api_token=FAKE_TOKEN, tables_file=TABLES_FILE, session=NullSession())
+    update = types.Update(
+        update_id=1,
+        message=types.Message(message_id=1, date=datetime.now(),
+                              chat=types.Chat(id=1, type="private"),
+                              from_user=types.User(id=1, is_bot=False, first_name="Bench"),
+                              text="/availabletablestoday"))
+    await ds.feed_update(bot, update)
+    return time.perf_counter() - start
+
+
+def measure_first_update(repeat: int) -> list:
+    """
+    Create new app for every run and process its first update
+    :param repeat:
+    :return: list of timings in seconds
+    """
+    return [asyncio.run(first_update()) for _ in range(repeat)]
+
+
+def report(name: str, timings: list) -> None:
+    print(f"{name}: min {min(timings) * 1000:.2f} ms, "
+          f"median {statistics.median(timings) * 1000:.2f} ms, "
+          f"max {max(timings) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup time of the bot")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs for each measurement")
+    args = parser.parse_args()
+    report("import run_bot", measure_import(args.repeat))
+    report("create_app till first update", measure_first_update(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
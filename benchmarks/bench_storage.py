@@ -0,0 +1,201 @@
+"""
+Benchmarks of TablesStorage on synthetic floor plans and reservation histories.
+Every operation is timed and its memory peak is traced with tracemalloc. Results are written to json file
+and can be compared with a baseline saved by previous run.
+
+Usage:
+    python benchmarks/bench_storage.py --save-baseline     # run and store results as baseline
+    python benchmarks/bench_storage.py --threshold 0.2     # run and fail if anything is 20% slower than baseline
+    python benchmarks/bench_storage.py --quick             # small grid, e.g. to check the script itself
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+BENCHMARKS_PATH = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(BENCHMARKS_PATH.parent))
+
+from restaurant_space import TablesStorage  # noqa: E402
+
+DEFAULT_OUTPUT = BENCHMARKS_PATH / Path("storage_results.json")
+DEFAULT_BASELINE = BENCHMARKS_PATH / Path("storage_baseline.json")
+
+TABLES_COUNTS = (10, 100, 1000)
+DAYS_COUNTS = (1, 30, 365)
+FILL_RATES = (0.1, 0.5, 0.9)
+QUICK_GRID = ((10,), (1, 30), (0.5,))
+
+CAPACITIES = (2, 2, 4, 4, 4, 6, 8)
+START_DATE = date(2030, 1, 1)
+SEED = 42
+# differences smaller than this are noise of the timer and scheduler, they are never reported as regression
+NOISE_FLOOR_S = 1e-6
+
+
+def generate_floor_plan(tables_count: int, rnd: random.Random) -> Tuple[Dict[str, str], ...]:
+    return tuple({"table_number": str(number), "capacity": str(rnd.choice(CAPACITIES))}
+                 for number in range(1, tables_count + 1))
+
+
+def generate_storage(tables_count: int, days: int, fill_rate: float) -> TablesStorage:
+    """
+    Create storage with given number of tables and dates, part of tables of every date is reserved
+    :param tables_count:
+    :param days:
+    :param fill_rate: part of reserved tables from 0 to 1
+    :return:
+    """
+    rnd = random.Random(SEED)
+    tables_storage = TablesStorage(generate_floor_plan(tables_count, rnd))
+    for shift in range(days):
+        business_date = START_DATE + timedelta(days=shift)
+        tables = tables_storage.get_tables_for_date(business_date)
+        for table in rnd.sample(tables, round(len(tables) * fill_rate)):
+            booking_time = datetime.combine(business_date, datetime.min.time()).replace(hour=rnd.randint(12, 22))
+            tables_storage.reserve_table(table, user_id=f"user{table.table_id}",
+                                         user_name=f"Guest {table.table_id}", booking_time=booking_time)
+    return tables_storage
+
+
+def measure(func: Callable, setup: Optional[Callable] = None, repeat: int = 5) -> Dict[str, float]:
+    """
+    Measure time and memory peak of the function. If setup is given, it is called before every run
+    and its result is passed to the function, time of setup is not counted
+    :param func:
+    :param setup:
+    :param repeat:
+    :return:
+    """
+    timings = []
+    if setup is None:
+        # fast operations are run several times in a row to get stable timings
+        number, _ = timeit.Timer(func).autorange()
+        timings = [timing / number for timing in timeit.Timer(func).repeat(repeat=repeat, number=number)]
+    else:
+        for _ in range(repeat):
+            argument = setup()
+            start = time.perf_counter()
+            func(argument)
+            timings.append(time.perf_counter() - start)
+    argument = setup() if setup else None
+    tracemalloc.start()
+    func(argument) if setup else func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"min_s": min(timings), "median_s": statistics.median(timings), "peak_kb": peak / 1024}
+
+
+def run_scenario(tables_count: int, days: int, fill_rate: float, repeat: int, work_dir: Path) -> Dict[str, Dict]:
+    tables_storage = generate_storage(tables_count, days, fill_rate)
+    middle_date = START_DATE + timedelta(days=days // 2)
+    tables = tables_storage.get_tables_for_date(middle_date)
+    backup_file = work_dir / Path(f"backup_{tables_count}_{days}_{fill_rate}.csv")
+    tables_storage.backup_to_csv_file(backup_file)
+    new_dates = (START_DATE + timedelta(days=days + shift) for shift in itertools.count())
+    floor_plan = generate_floor_plan(tables_count, random.Random(SEED))
+
+    results = {
+        "get_tables_for_date": measure(lambda: tables_storage.get_tables_for_date(middle_date), repeat=repeat),
+        "search_for_table": measure(lambda: tables_storage.search_for_table(4, tables), repeat=repeat),
+        "get_all_tables": measure(lambda: tables_storage.get_all_tables, repeat=repeat),
+        "backup_to_csv_file": measure(lambda path: tables_storage.backup_to_csv_file(path),
+                                      setup=lambda: work_dir / Path("backup_out.csv"), repeat=repeat),
+        "upload_backup_file": measure(lambda storage: storage.upload_backup_file(backup_file),
+                                      setup=lambda: TablesStorage(floor_plan), repeat=repeat),
+        # runs last, because it adds new dates to the storage
+        "get_tables_for_new_date": measure(lambda business_date: tables_storage.get_tables_for_date(business_date),
+                                           setup=lambda: next(new_dates), repeat=repeat),
+    }
+    backup_file.unlink()
+    return results
+
+
+def run_benchmarks(grid: Tuple[Tuple, Tuple, Tuple], repeat: int) -> Dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for tables_count, days, fill_rate in itertools.product(*grid):
+            scenario = f"tables={tables_count},days={days},fill={fill_rate}"
+            print(f"Running {scenario}", flush=True)
+            results[scenario] = run_scenario(tables_count, days, fill_rate, repeat, Path(work_dir))
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "created_at": datetime.now().isoformat(timespec="seconds"), "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> bool:
+    """
+    Print comparison of minimal timings with baseline. Minimum is used, because noise only adds time
+    :param current:
+    :param baseline:
+    :param threshold: allowed slowdown, e.g. 0.2 for 20%
+    :return: False if any operation is slower than allowed
+    """
+    passed = True
+    for scenario, operations in current["results"].items():
+        for operation, result in operations.items():
+            base = baseline["results"].get(scenario, {}).get(operation)
+            if base is None:
+                continue
+            ratio = result["min_s"] / base["min_s"] if base["min_s"] else 1.0
+            regression = ratio > 1 + threshold and result["min_s"] - base["min_s"] > NOISE_FLOOR_S
+            passed = passed and not regression
+            print(f"{'REGRESSION' if regression else 'ok':<10} {scenario:<32} {operation:<24} "
+                  f"{base['min_s'] * 1e6:>12.1f} us -> {result['min_s'] * 1e6:>12.1f} us ({ratio:.2f}x)")
+    return passed
+
+
+def report(results: Dict) -> None:
+    for scenario, operations in results["results"].items():
+        print(scenario)
+        for operation, result in operations.items():
+            print(f"    {operation:<24} min {result['min_s'] * 1e6:>12.1f} us, "
+                  f"median {result['median_s'] * 1e6:>12.1f} us, "
+                  f"peak memory {result['peak_kb']:>10.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of TablesStorage")
+    parser.add_argument("--quick", action="store_true", help="run small grid of scenarios")
+    parser.add_argument("--repeat", type=int, default=7, help="number of measurements for each operation")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="file to write results to")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="file with baseline results")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown compared to baseline")
+    args = parser.parse_args()
+
+    grid = QUICK_GRID if args.quick else (TABLES_COUNTS, DAYS_COUNTS, FILL_RATES)
+    results = run_benchmarks(grid, args.repeat)
+    report(results)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results are written to {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline is saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"Baseline {args.baseline} is not found, use --save-baseline to create it")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    if not compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
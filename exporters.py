@@ -0,0 +1,127 @@
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from restaurant_space import Table, IMPORT_FIELDS
+
+# exported csv can be imported back with /importbookings
+EXPORT_CSV_FIELDS = (*IMPORT_FIELDS, "capacity", "user_id")
+# booking is kept for 1 hour after booking time
+BOOKING_DURATION = timedelta(hours=1)
+
+CSV_FORMAT = "csv"
+ICS_FORMAT = "ics"
+EXPORT_FORMATS = (CSV_FORMAT, ICS_FORMAT)
+# longer lines of iCalendar file are folded, as required by RFC 5545
+ICS_LINE_LIMIT = 75
+
+
+def get_booking_start(table: Table) -> Optional[datetime]:
+    """
+    Get date and time of booking, None if time is not set (e.g. for force booking)
+    :param table:
+    :return:
+    """
+    if not isinstance(table.booking_time, datetime):
+        return None
+    # time restored from backup has no date, so date of the table is used
+    return datetime.combine(table.booking_date, table.booking_time.time())
+
+
+def write_csv(tables: Iterable[Table], file: BinaryIO) -> int:
+    """
+    Write tables to binary file row by row
+    :param tables:
+    :param file:
+    :return: number of written tables
+    """
+    count = 0
+    text_file = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    writer = csv.DictWriter(text_file, fieldnames=EXPORT_CSV_FIELDS)
+    writer.writeheader()
+    for table in tables:
+        writer.writerow({
+            "date": table.readable_booking_date,
+            "table_id": table.table_id,
+            "booking_time": table.readable_booking_time if get_booking_start(table) else "",
+            "user_name": table.user_name or "",
+            "capacity": table.capacity,
+            "user_id": table.user_id or "",
+        })
+        count += 1
+    # file is detached, so it is not closed together with the wrapper
+    text_file.flush()
+    text_file.detach()
+    return count
+
+
+def _escape_ics_text(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _fold_ics_line(line: str) -> bytes:
+    """
+    Split line into parts of at most ICS_LINE_LIMIT octets, every next part starts with a space
+    :param line:
+    :return: encoded line with CRLF at the end
+    """
+    data = line.encode("utf-8")
+    parts = []
+    limit = ICS_LINE_LIMIT
+    while len(data) > limit:
+        cut = limit
+        # utf-8 character is not split, its continuation bytes are 10xxxxxx
+        while data[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(data[:cut])
+        data = data[cut:]
+        # leading space of the next part is counted in its length
+        limit = ICS_LINE_LIMIT - 1
+    parts.append(data)
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def iter_ics_lines(tables: Iterable[Table], now: Optional[datetime] = None) -> Iterator[str]:
+    """
+    Generate lines of iCalendar file, every reservation is a separate event
+    :param tables:
+    :param now: time of export, current time by default
+    :return:
+    """
+    stamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield "PRODID:-//telegram-bot-booking//bookings export//EN"
+    for table in tables:
+        start = get_booking_start(table)
+        yield "BEGIN:VEVENT"
+        yield f"UID:{table.booking_date.strftime('%Y%m%d')}-table-{table.table_id}@telegram-bot-booking"
+        yield f"DTSTAMP:{stamp}"
+        if start:
+            # local time of the restaurant is used, so time is written without timezone
+            yield f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}"
+            yield f"DTEND:{(start + BOOKING_DURATION).strftime('%Y%m%dT%H%M%S')}"
+        else:
+            yield f"DTSTART;VALUE=DATE:{table.booking_date.strftime('%Y%m%d')}"
+        yield f"SUMMARY:{_escape_ics_text(f'Table {table.table_id} ({table.capacity} seats): {table.user_name}')}"
+        if table.user_id:
+            yield f"DESCRIPTION:{_escape_ics_text(f'Booked by {table.user_id}')}"
+        yield "END:VEVENT"
+    yield "END:VCALENDAR"
+
+
+def write_ics(tables: Iterable[Table], file: BinaryIO) -> int:
+    """
+    Write tables to binary file as iCalendar events, long lines are folded
+    :param tables:
+    :param file:
+    :return: number of written tables
+    """
+    count = 0
+    for line in iter_ics_lines(tables):
+        if line == "BEGIN:VEVENT":
+            count += 1
+        file.write(_fold_ics_line(line))
+    return count
@@ -0,0 +1,99 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+# time range when tables can be booked and step between booking slots
+OPENING_TIME = time(hour=12)
+LAST_BOOKING_TIME = time(hour=22)
+SLOT_STEP = timedelta(minutes=30)
+
+# number of days shown in the calendar and number of buttons in one row
+CALENDAR_DAYS = 14
+BUTTONS_IN_ROW = 4
+
+DAY_FORMAT = "%Y%m%d"
+SLOT_FORMAT = "%H%M"
+
+
+class BookingDateCallback(CallbackData, prefix="bdate"):
+    day: str
+
+
+class BookingSeatsCallback(CallbackData, prefix="bseats"):
+    day: str
+    seats: int
+
+
+class BookingTimeCallback(CallbackData, prefix="btime"):
+    day: str
+    seats: int
+    slot: str
+
+
+class BookingConfirmCallback(CallbackData, prefix="bconfirm"):
+    day: str
+    seats: int
+    slot: str
+    confirmed: bool
+
+
+def _split_to_rows(buttons: List[InlineKeyboardButton]) -> List[List[InlineKeyboardButton]]:
+    return [buttons[i:i + BUTTONS_IN_ROW] for i in range(0, len(buttons), BUTTONS_IN_ROW)]
+
+
+def parse_day(day: str) -> date:
+    return datetime.strptime(day, DAY_FORMAT).date()
+
+
+def get_time_slots(business_date: date, now: Optional[datetime] = None) -> Tuple[time, ...]:
+    """
+    Get booking slots for a given date, slots in the past are skipped
+    :param business_date:
+    :param now: current time, datetime.now() by default
+    :return:
+    """
+    now = now or datetime.now()
+    slot = datetime.combine(business_date, OPENING_TIME)
+    last_slot = datetime.combine(business_date, LAST_BOOKING_TIME)
+    slots = []
+    while slot <= last_slot:
+        if slot > now:
+            slots.append(slot.time())
+        slot += SLOT_STEP
+    return tuple(slots)
+
+
+def calendar_keyboard(dates: Iterable[date]) -> InlineKeyboardMarkup:
+    buttons = [InlineKeyboardButton(text=business_date.strftime("%d.%m %a"),
+                                    callback_data=BookingDateCallback(day=business_date.strftime(DAY_FORMAT)).pack())
+               for business_date in dates]
+    return InlineKeyboardMarkup(inline_keyboard=_split_to_rows(buttons))
+
+
+def seats_keyboard(day: str, max_seats: int) -> InlineKeyboardMarkup:
+    buttons = [InlineKeyboardButton(text=f"{seats} seats",
+                                    callback_data=BookingSeatsCallback(day=day, seats=seats).pack())
+               for seats in range(1, max_seats + 1)]
+    return InlineKeyboardMarkup(inline_keyboard=_split_to_rows(buttons))
+
+
+def time_slots_keyboard(day: str, seats: int, slots: Iterable[time]) -> InlineKeyboardMarkup:
+    buttons = [InlineKeyboardButton(text=slot.strftime("%H:%M"),
+                                    callback_data=BookingTimeCallback(day=day, seats=seats,
+                                                                      slot=slot.strftime(SLOT_FORMAT)).pack())
+               for slot in slots]
+    return InlineKeyboardMarkup(inline_keyboard=_split_to_rows(buttons))
+
+
+def confirmation_keyboard(day: str, seats: int, slot: str, name: str) -> InlineKeyboardMarkup:
+    booking_time = datetime.strptime(f"{day}{slot}", f"{DAY_FORMAT}{SLOT_FORMAT}")
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=f"Book {seats} seats {booking_time.strftime('%d.%m %H:%M')} for {name}",
+                              callback_data=BookingConfirmCallback(day=day, seats=seats, slot=slot,
+                                                                   confirmed=True).pack())],
+        [InlineKeyboardButton(text="Cancel",
+                              callback_data=BookingConfirmCallback(day=day, seats=seats, slot=slot,
+                                                                   confirmed=False).pack())],
+    ])
@@ -0,0 +1,87 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.filters import BaseFilter
+from aiogram.types import TelegramObject, Update
+
+from roles import Role, RoleRegistry, STAFF_ROLES
+from throttling import RateLimiter, RecentIds
+
+_logger = logging.getLogger(__name__)
+
+
+class RoleMiddleware(BaseMiddleware):
+    """
+    Resolves role of the caller once per update and passes it to filters and handlers as 'role'.
+    Has to be registered as outer middleware of updates, after user context is resolved by dispatcher
+    """
+
+    def __init__(self, registry: RoleRegistry):
+        self._registry = registry
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        chat = data.get("event_chat")
+        user = data.get("event_from_user")
+        data["role"] = self._registry.resolve(chat.id if chat else None, user.id if user else None)
+        return await handler(event, data)
+
+
+class RoleFilter(BaseFilter):
+    """
+    Passes only updates from callers with one of given roles
+    """
+
+    def __init__(self, *roles: Role):
+        self._roles = roles
+
+    async def __call__(self, event: TelegramObject, role: Role = Role.CUSTOMER) -> bool:
+        return role in self._roles
+
+
+class DeduplicationMiddleware(BaseMiddleware):
+    """
+    Skips updates which are already handled, e.g. when webhook is retried.
+    Has to be registered as outer middleware of updates
+    """
+
+    def __init__(self, recent_ids: RecentIds):
+        self._recent_ids = recent_ids
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: Update, data: Dict[str, Any]) -> Any:
+        if not self._recent_ids.add(event.update_id):
+            _logger.info(f"Update {event.update_id} is already handled, skipping it")
+            return None
+        return await handler(event, data)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Limits rate of requests of every user, throttled user gets only one notice.
+    Has to be registered as outer middleware of updates after RoleMiddleware, so staff is not limited
+    """
+
+    def __init__(self, rate_limiter: RateLimiter, exempt_roles: Tuple[Role, ...] = STAFF_ROLES):
+        self._rate_limiter = rate_limiter
+        self._exempt_roles = exempt_roles
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: Update, data: Dict[str, Any]) -> Any:
+        user = data.get("event_from_user")
+        if user is None or data.get("role") in self._exempt_roles:
+            return await handler(event, data)
+        command = None
+        if event.message and event.message.text and event.message.text.startswith("/"):
+            # '/command@bot_name args' -> 'command'
+            command = (event.message.text[1:].split(maxsplit=1) or [""])[0].split("@")[0].lower()
+        if self._rate_limiter.allow(user.id, command):
+            return await handler(event, data)
+        _logger.info(f"User {user.id} is throttled")
+        if self._rate_limiter.should_notify(user.id):
+            if event.message:
+                await event.message.answer("Too many requests. Please wait a bit and try again")
+            elif event.callback_query:
+                await event.callback_query.answer("Too many requests. Please wait a bit and try again")
+        return None
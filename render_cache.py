@@ -0,0 +1,110 @@
+import logging
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Hashable, Tuple
+
+from restaurant_space import TablesStorage, Table
+
+_logger = logging.getLogger(__name__)
+
+AVAILABLE_VIEW = "available"
+BOOKINGS_VIEW = "bookings"
+
+
+class LRUCache:
+    """
+    Bounded cache which drops the least recently used entry when it is full
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self._maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_or_create(self, key: Hashable, factory: Callable):
+        """
+        Return value for the key, value is created with factory if it is not cached yet
+        :param key:
+        :param factory:
+        :return:
+        """
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+        self.misses += 1
+        value = factory()
+        self._data[key] = value
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+        return value
+
+
+def render_table_booking(table: Table) -> str:
+    return (f"\nDate: {table.readable_booking_date},"
+            f"\nTable №: {table.table_id},"
+            f"\nNumber of seats: {table.capacity},"
+            f"\nBooking time: {table.readable_booking_time},"
+            f"\nName: {table.user_name}")
+
+
+def render_available_tables(tables: Tuple[Table, ...], date_title: str) -> Tuple[str, ...]:
+    return tuple(f"Available table for {date_title}: "
+                 f"\nID: {table.table_id}"
+                 f"\nNumber of seats: {table.capacity}"
+                 for table in tables if not table.is_reserved)
+
+
+def render_bookings(tables: Tuple[Table, ...]) -> Tuple[str, ...]:
+    return tuple(render_table_booking(table) for table in tables if table.is_reserved)
+
+
+class ListingsCache:
+    """
+    Cache of rendered availability and bookings listings.
+    Entries are keyed by date, version of the date and view, so any reservation
+    or cancellation makes old entries unreachable and they are evicted eventually
+    """
+
+    def __init__(self, tables_storage: TablesStorage, maxsize: int = 256):
+        self._tables_storage = tables_storage
+        self._cache = LRUCache(maxsize)
+
+    @property
+    def hit_rate(self) -> float:
+        return self._cache.hit_rate
+
+    def _get(self, business_date: date, view: str, render: Callable) -> Tuple[str, ...]:
+        # tables have to be created before version is read, otherwise first version is not stable
+        tables = self._tables_storage.get_tables_for_date(business_date)
+        key = (business_date, self._tables_storage.get_version(business_date), view)
+        listing = self._cache.get_or_create(key, lambda: render(tables))
+        _logger.debug(f"Listings cache hit rate: {self.hit_rate:.2%}, size: {len(self._cache)}")
+        return listing
+
+    def available_tables(self, business_date: date, date_title: str) -> Tuple[str, ...]:
+        """
+        Get rendered messages with free tables for the date
+        :param business_date:
+        :param date_title: how the date is shown to user, e.g. 'today'
+        :return:
+        """
+        return self._get(business_date, f"{AVAILABLE_VIEW}:{date_title}",
+                         lambda tables: render_available_tables(tables, date_title))
+
+    def bookings(self, business_date: date) -> Tuple[str, ...]:
+        """
+        Get rendered messages with reserved tables for the date
+        :param business_date:
+        :return:
+        """
+        return self._get(business_date, BOOKINGS_VIEW, render_bookings)
@@ -1,8 +1,10 @@
 import csv
-from dataclasses import dataclass
-from datetime import datetime, date
+from dataclasses import dataclass, field
+from datetime import datetime, date, timedelta
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+IMPORT_FIELDS = ("date", "table_id", "booking_time", "user_name")
 
 
 @dataclass(repr=True)
@@ -46,6 +48,22 @@ class Table:
 class CalendarDate:
     business_date: date
     tables: Tuple[Table, ...] = tuple()
+    # bumped on every change of tables for the date, used to invalidate cached views
+    version: int = 0
+
+@dataclass(repr=True)
+class ImportResult:
+    accepted: int = 0
+    # line number in the file and the reason why row is rejected
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+
+@dataclass(repr=True)
+class ReloadResult:
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    resized: List[int] = field(default_factory=list)
+    # reserved tables which are removed from floor plan or became smaller, they are kept till cancellation
+    orphaned: List[Table] = field(default_factory=list)
 
 class TablesStorage:
 
@@ -55,7 +73,9 @@ class TablesStorage:
             for table in available_tables
         }
         self._calendar: Dict[date, CalendarDate] = {}
-        
+        # date -> (version, biggest capacity of free table), recalculated when version changes
+        self._free_capacity_index: Dict[date, Tuple[int, int]] = {}
+
     def get_tables_for_date(self, business_date: date) -> Tuple[Table, ...]:
         """
         Get tables for a given business date adn return all of them
@@ -69,6 +89,60 @@ class TablesStorage:
             self._calendar[business_date] = CalendarDate(business_date, tables)
         return self._calendar[business_date].tables
 
+    def get_version(self, business_date: date) -> int:
+        """
+        Get version of the tables for a given date, it changes after every reservation or cancellation
+        :param business_date:
+        :return:
+        """
+        if business_date not in self._calendar:
+            return 0
+        return self._calendar[business_date].version
+
+    def bump_version(self, business_date: date) -> None:
+        """
+        Mark tables for a given date as changed
+        :param business_date:
+        :return:
+        """
+        if business_date in self._calendar:
+            self._calendar[business_date].version += 1
+
+    def reserve_table(self, table: Table, user_id: str = None,
+                      user_name: str = None, booking_time: datetime or str = None) -> None:
+        """
+        Reserve table and bump version of its date. Name and time are kept if they are not provided
+        :param table:
+        :param user_id:
+        :param user_name:
+        :param booking_time:
+        :return:
+        """
+        table.is_reserved = True
+        if user_id is not None:
+            table.user_id = user_id
+        if user_name is not None:
+            table.user_name = user_name
+        if booking_time is not None:
+            table.booking_time = booking_time
+        self.bump_version(table.booking_date)
+
+    def release_table(self, table: Table) -> None:
+        """
+        Cancel reservation of the table and bump version of its date
+        :param table:
+        :return:
+        """
+        table.is_reserved = False
+        table.booking_time = None
+        table.user_name = None
+        table.user_id = None
+        if str(table.table_id) not in self._tables and table.booking_date in self._calendar:
+            # table is removed from floor plan and was kept only because of reservation
+            date_info = self._calendar[table.booking_date]
+            date_info.tables = tuple(item for item in date_info.tables if item is not table)
+        self.bump_version(table.booking_date)
+
     @staticmethod
     def search_for_table(capacity: int, tables: Tuple[Table, ...]) -> Optional[Table]:
         """
@@ -86,10 +160,173 @@ class TablesStorage:
             return best_table
         return None
 
+    def get_free_capacity(self, business_date: date) -> int:
+        """
+        Get capacity of the biggest free table for a given date, 0 if all tables are reserved
+        :param business_date:
+        :return:
+        """
+        if business_date not in self._calendar:
+            # date is not requested yet, so all tables are free and there is no need to create them
+            return max((int(capacity) for capacity in self._tables.values()), default=0)
+        version = self.get_version(business_date)
+        cached = self._free_capacity_index.get(business_date)
+        if cached is None or cached[0] != version:
+            capacity = max((table.capacity for table in self._calendar[business_date].tables
+                            if not table.is_reserved), default=0)
+            cached = (version, capacity)
+            self._free_capacity_index[business_date] = cached
+        return cached[1]
+
+    def get_dates_with_free_tables(self, start_date: date, days: int) -> Tuple[date, ...]:
+        """
+        Get dates from start date which have at least one free table
+        :param start_date:
+        :param days: number of days to check
+        :return:
+        """
+        dates = (start_date + timedelta(days=shift) for shift in range(days))
+        return tuple(business_date for business_date in dates if self.get_free_capacity(business_date))
+
     @property
     def get_all_tables(self) -> Dict[date, Tuple[Table, ...]]:
         return {date_info.business_date: date_info.tables for date_info in self._calendar.values()}
 
+    def iter_reserved_tables(self, start_date: date = None, end_date: date = None) -> Iterator[Table]:
+        """
+        Iterate over reserved tables ordered by date, tables are not copied
+        :param start_date: first date to include, all dates by default
+        :param end_date: last date to include, all dates by default
+        :return:
+        """
+        for business_date in sorted(self._calendar):
+            if start_date and business_date < start_date or end_date and business_date > end_date:
+                continue
+            for table in self._calendar[business_date].tables:
+                if table.is_reserved:
+                    yield table
+
+    def import_reservations(self, rows: Iterable[Dict[str, str]],
+                            user_id: str = None, today: date = None, now: datetime = None) -> ImportResult:
+        """
+        Validate all rows against the storage and reserve tables for valid ones.
+        Rows are validated before any table is changed, then reservations are applied date by date,
+        so nobody sees a date with only part of its reservations
+        :param rows: dicts with keys date (DD.MM.YYYY), table_id, booking_time (HH:MM) and user_name
+        :param user_id: user who imports reservations
+        :param today: first date which can be booked, today by default
+        :param now: first time which can be booked, current time by default
+        :return:
+        """
+        today = today or date.today()
+        now = now or datetime.now()
+        result = ImportResult()
+        accepted: Dict[date, Dict[int, Tuple[Optional[datetime], str]]] = {}
+        # already reserved tables are collected once per date instead of scanning tables for every row
+        reserved_ids: Dict[date, set] = {}
+        # line 1 is a header of the file
+        for line, row in enumerate(rows, start=2):
+            try:
+                business_date = datetime.strptime(row["date"].strip(), "%d.%m.%Y").date()
+                table_id = int(row["table_id"])
+                booking_time = (datetime.strptime(f"{row['date'].strip()} {row['booking_time'].strip()}",
+                                                  "%d.%m.%Y %H:%M")
+                                if row.get("booking_time") else None)
+            except (KeyError, TypeError, ValueError):
+                result.rejected.append((line, "invalid date, table or time"))
+                continue
+            if business_date < today:
+                result.rejected.append((line, "date is in the past"))
+                continue
+            if booking_time and booking_time < now:
+                result.rejected.append((line, "time is in the past"))
+                continue
+            if str(table_id) not in self._tables:
+                result.rejected.append((line, f"table {table_id} does not exist"))
+                continue
+            date_reservations = accepted.setdefault(business_date, {})
+            if table_id in date_reservations:
+                result.rejected.append((line, f"table {table_id} is booked twice in the file"))
+                continue
+            if business_date not in reserved_ids:
+                reserved_ids[business_date] = {table.table_id for table in
+                                               self._calendar.get(business_date, CalendarDate(business_date)).tables
+                                               if table.is_reserved}
+            if table_id in reserved_ids[business_date]:
+                result.rejected.append((line, f"table {table_id} is already reserved"))
+                continue
+            date_reservations[table_id] = (booking_time, row.get("user_name") or "")
+
+        for business_date, reservations in accepted.items():
+            for table in self.get_tables_for_date(business_date):
+                if table.table_id not in reservations:
+                    continue
+                booking_time, user_name = reservations[table.table_id]
+                table.is_reserved = True
+                table.user_id = user_id
+                table.user_name = user_name
+                table.booking_time = booking_time or "N/A"
+            self.bump_version(business_date)
+            result.accepted += len(reservations)
+        return result
+
+    def reload_tables(self, available_tables: Tuple[Dict[str, str], ...], today: date = None) -> ReloadResult:
+        """
+        Apply new floor plan to the storage. Tables of today and future dates are updated in place,
+        past dates are not changed. Reserved tables are never dropped, they are returned as orphaned instead
+        :param available_tables: rows with table_number and capacity, as in tables distribution file
+        :param today: first date to update, today by default
+        :return:
+        """
+        today = today or date.today()
+        new_tables = {table["table_number"]: table["capacity"] for table in available_tables}
+        # every row is parsed before anything is changed, so a broken file leaves the storage as it was
+        capacities = {int(number): int(capacity) for number, capacity in new_tables.items()}
+        old_numbers = {int(number) for number in self._tables}
+        result = ReloadResult(
+            added=sorted(capacities.keys() - old_numbers),
+            removed=sorted(old_numbers - capacities.keys()),
+            resized=sorted(number for number in capacities.keys() & old_numbers
+                           if capacities[number] != int(self._tables[str(number)])),
+        )
+        self._tables = new_tables
+        if not (result.added or result.removed or result.resized):
+            return result
+        for business_date in sorted(self._calendar):
+            if business_date < today:
+                continue
+            date_info = self._calendar[business_date]
+            tables = []
+            for table in date_info.tables:
+                if table.table_id not in capacities:
+                    if table.is_reserved:
+                        result.orphaned.append(table)
+                        tables.append(table)
+                    continue
+                capacity = capacities[table.table_id]
+                if table.is_reserved and capacity < table.capacity:
+                    result.orphaned.append(table)
+                table.capacity = capacity
+                tables.append(table)
+            # reserved table which was removed earlier and is added back is reused, so it is not duplicated
+            kept_numbers = {table.table_id for table in tables}
+            tables.extend(Table(table_id=number, capacity=capacities[number], booking_date=business_date)
+                          for number in result.added if number not in kept_numbers)
+            date_info.tables = tuple(tables)
+            self.bump_version(business_date)
+        return result
+
+    @staticmethod
+    def read_tables_csv(file_path: str or Path) -> Tuple[Dict[str, str], ...]:
+        """
+        Read tables distribution file with columns table_number, capacity
+        :param file_path:
+        :return:
+        """
+        with open(file_path, 'r') as file:
+            reader = csv.DictReader(file)
+            return tuple(row for row in reader)
+
     @classmethod
     def from_csv_file(cls, file_path: str or Path) -> 'TablesStorage':
         """
@@ -97,10 +334,15 @@ class TablesStorage:
         :param file_path:
         :return:
         """
-        with open(file_path, 'r') as file:
-            reader = csv.DictReader(file)
-            available_tables = tuple(row for row in reader)
-        return cls(available_tables)
+        return cls(cls.read_tables_csv(file_path))
+
+    def reload_from_csv_file(self, file_path: str or Path) -> ReloadResult:
+        """
+        Method applies tables distribution from a csv file to the storage
+        :param file_path:
+        :return:
+        """
+        return self.reload_tables(self.read_tables_csv(file_path))
 
 
     def backup_to_csv_file(self, file_path: str or Path):
@@ -120,13 +362,20 @@ class TablesStorage:
                     result = {"date": date_info.business_date.strftime("%d.%m.%Y"), **table.to_csv_row}
                     writer.writerow(result)
 
+    @staticmethod
+    def _parse_backup_time(booking_time: str) -> Optional[datetime or str]:
+        # tables booked without time (force booking, import) keep "N/A" instead of time
+        if not booking_time or booking_time == "N/A":
+            return booking_time or None
+        return datetime.strptime(booking_time, "%H:%M")
+
     def upload_backup_file(self, file: str or Path):
         """
         Method uploads backup file to the storage
         :param file:
         :return:
         """
-        hashes = []
+        hashes = set()
         with open(file, "r", encoding="utf-8") as file:
             reader = csv.DictReader(file)
             for row in reader:
@@ -137,10 +386,10 @@ class TablesStorage:
                                 booking_date=(datetime.strptime(row["booking_date"], "%d.%m.%Y").date()
                                                 if row["booking_date"] else None),
                               is_reserved=row["is_reserved"] == "True",
-                              booking_time=(datetime.strptime(row["booking_time"], "%H:%M")
-                                            if row["booking_time"] else None),
+                              booking_time=self._parse_backup_time(row["booking_time"]),
                               user_name=row["user_name"])
                 tb_hash = hash(table)
                 if tb_hash not in hashes:
-                    hashes.append(tb_hash)
-                    self._calendar[business_date].tables += (table,)
\ No newline at end of file
+                    hashes.add(tb_hash)
+                    self._calendar[business_date].tables += (table,)
+                    self.bump_version(business_date)
\ No newline at end of file
@@ -0,0 +1,134 @@
+import csv
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import FrozenSet, Optional
+
+_logger = logging.getLogger(__name__)
+
+# how often roles file is checked for changes, in seconds
+ROLES_FILE_CHECK_INTERVAL = 5
+
+
+class Role(str, Enum):
+    CUSTOMER = "customer"
+    MANAGER = "manager"
+    ADMIN = "admin"
+
+
+STAFF_ROLES = (Role.MANAGER, Role.ADMIN)
+
+
+def parse_ids(value: Optional[str]) -> FrozenSet[str]:
+    """
+    Parse ids separated by commas or spaces, e.g. value of ALLOWED_CHAT_IDS
+    :param value:
+    :return:
+    """
+    if not value:
+        return frozenset()
+    return frozenset(item for item in re.split(r"[,\s]+", value) if item)
+
+
+@dataclass(frozen=True)
+class RoleSet:
+    managers: FrozenSet[str] = frozenset()
+    admins: FrozenSet[str] = frozenset()
+
+    def resolve(self, *ids: Optional[int or str]) -> Role:
+        """
+        Get role by chat id and user id, the highest role of given ids is returned
+        :param ids:
+        :return:
+        """
+        ids = {str(item) for item in ids if item is not None}
+        if ids & self.admins:
+            return Role.ADMIN
+        if ids & self.managers:
+            return Role.MANAGER
+        return Role.CUSTOMER
+
+    def merge(self, other: 'RoleSet') -> 'RoleSet':
+        return RoleSet(managers=self.managers | other.managers, admins=self.admins | other.admins)
+
+    @classmethod
+    def from_csv_file(cls, file_path: str or Path) -> 'RoleSet':
+        """
+        Read roles from csv file with columns id, role
+        :param file_path:
+        :return:
+        """
+        managers, admins = set(), set()
+        with open(file_path, "r", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                role = (row.get("role") or "").strip().lower()
+                if role == Role.ADMIN:
+                    admins.add(row["id"].strip())
+                elif role == Role.MANAGER:
+                    managers.add(row["id"].strip())
+                else:
+                    _logger.warning(f"Unknown role '{role}' for id {row.get('id')}")
+        return cls(managers=frozenset(managers), admins=frozenset(admins))
+
+
+class RoleRegistry:
+    """
+    Keeps roles from environment and from optional roles file.
+    Roles file is re-read when it is changed, so roles can be updated without restart
+    """
+
+    def __init__(self, base_roles: RoleSet, roles_file: Optional[str or Path] = None,
+                 check_interval: float = ROLES_FILE_CHECK_INTERVAL):
+        self._base_roles = base_roles
+        self._roles_file = Path(roles_file) if roles_file else None
+        self._check_interval = check_interval
+        self._last_check = 0.0
+        self._file_mtime: Optional[float] = None
+        self._roles = base_roles
+        self.reload_if_changed()
+
+    @property
+    def roles(self) -> RoleSet:
+        return self._roles
+
+    def reload_if_changed(self) -> None:
+        if self._roles_file is None:
+            return
+        self._last_check = time.monotonic()
+        try:
+            mtime = os.stat(self._roles_file).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._file_mtime:
+            return
+        self._file_mtime = mtime
+        if mtime is None:
+            _logger.warning(f"Roles file {self._roles_file} is not found, only roles from environment are used")
+            self._roles = self._base_roles
+            return
+        try:
+            self._roles = self._base_roles.merge(RoleSet.from_csv_file(self._roles_file))
+        except (OSError, KeyError, csv.Error):
+            # previous roles are kept until the file is fixed
+            _logger.exception(f"Failed to read roles file {self._roles_file}")
+            return
+        _logger.info(f"Roles are loaded from {self._roles_file}")
+
+    def resolve(self, chat_id: Optional[int or str], user_id: Optional[int or str]) -> Role:
+        if time.monotonic() - self._last_check >= self._check_interval:
+            self.reload_if_changed()
+        return self._roles.resolve(chat_id, user_id)
+
+    @classmethod
+    def from_env(cls) -> 'RoleRegistry':
+        """
+        Create registry from GROUP_CHAT_ID, ALLOWED_CHAT_IDS, ADMIN_IDS and ROLES_FILE environment variables
+        :return:
+        """
+        managers = parse_ids(os.getenv("GROUP_CHAT_ID")) | parse_ids(os.getenv("ALLOWED_CHAT_IDS"))
+        admins = parse_ids(os.getenv("ADMIN_IDS"))
+        return cls(RoleSet(managers=managers, admins=admins), os.getenv("ROLES_FILE"))
@@ -0,0 +1,48 @@
+from typing import Any, Callable, List, Tuple
+
+from aiogram import Router
+
+# observers of router which are used by the bot
+OBSERVERS = ("message", "callback_query")
+
+
+class RouterTemplate:
+    """
+    Collects handlers with the same decorators as aiogram Router, but is not attached to any dispatcher.
+    Router attached to a dispatcher can't be attached to another one, so every dispatcher gets
+    a new router created from the template
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._router_filters: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._handlers: List[Tuple[str, Callable, Tuple[Any, ...], dict]] = []
+
+    def filter(self, *filters: Any) -> None:
+        """
+        Add filters to all observers of the router, as router.message.filter and router.callback_query.filter
+        :param filters:
+        :return:
+        """
+        for observer in OBSERVERS:
+            self._router_filters.append((observer, filters))
+
+    def _register(self, observer: str, filters: Tuple[Any, ...], kwargs: dict) -> Callable[[Callable], Callable]:
+        def decorator(callback: Callable) -> Callable:
+            self._handlers.append((observer, callback, filters, kwargs))
+            return callback
+        return decorator
+
+    def message(self, *filters: Any, **kwargs: Any) -> Callable[[Callable], Callable]:
+        return self._register("message", filters, kwargs)
+
+    def callback_query(self, *filters: Any, **kwargs: Any) -> Callable[[Callable], Callable]:
+        return self._register("callback_query", filters, kwargs)
+
+    def create_router(self) -> Router:
+        router = Router(name=self.name)
+        for observer, filters in self._router_filters:
+            getattr(router, observer).filter(*filters)
+        for observer, callback, filters, kwargs in self._handlers:
+            getattr(router, observer).register(callback, *filters, **kwargs)
+        return router
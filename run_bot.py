@@ -1,46 +1,101 @@
 import asyncio
+import csv
+import io
 import logging.config
 import os
 import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 
-from faker import Faker
 from aiogram import Bot, Dispatcher, types
-from aiogram.filters import Command
+from aiogram.client.session.base import BaseSession
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, BufferedInputFile
 
+from exporters import EXPORT_FORMATS, CSV_FORMAT, write_csv, write_ics
+from keyboards import (BookingDateCallback, BookingSeatsCallback, BookingTimeCallback, BookingConfirmCallback,
+                       CALENDAR_DAYS, calendar_keyboard, seats_keyboard, time_slots_keyboard,
+                       confirmation_keyboard, get_time_slots, parse_day)
 from logging_conf import log_config
-from restaurant_space import TablesStorage, Table
+from middlewares import RoleMiddleware, RoleFilter, DeduplicationMiddleware, ThrottlingMiddleware
+from render_cache import ListingsCache, render_table_booking
+from restaurant_space import TablesStorage, Table, ReloadResult, IMPORT_FIELDS
+from roles import Role, RoleRegistry, STAFF_ROLES
+from routers import RouterTemplate
+from throttling import RateLimiter, RecentIds
 from text_for_helps import customer_help, manager_help
-from validators import validate_date, validate_time, validate_seats
-
-logging.config.dictConfig(log_config)
+from validators import validate_date, validate_time, validate_seats, validate_export_options
 
 _logger = logging.getLogger(__name__)
 
 # assign environment variables to variables
-api_token = os.getenv("TELEGRAM_API_TOKEN")
-
 group_chat_id = str(os.getenv("GROUP_CHAT_ID"))
 
-dist_tables = Path(os.path.dirname(__file__)) / Path("tables_distribution") / Path(os.getenv("TABLES_FILE"))
-allowed_chat_ids = {os.getenv("ALLOWED_CHAT_IDS")} | {group_chat_id}
-backup_csv_file = Path(os.path.dirname(__file__)) / Path("./backup_tables.csv")
+backup_csv_file = Path(os.path.dirname(__file__)) / Path(os.getenv("BACKUP_FILE", "./backup_tables.csv"))
 
-# create relevant objects
-tables_storage = TablesStorage.from_csv_file(Path(dist_tables))
+# handlers are collected in templates, routers with them and heavy objects are created by create_app
+router = RouterTemplate("customers")
+# commands for managers and admins only, other users are rejected before handlers are called
+manager_router = RouterTemplate("managers")
+manager_router.filter(RoleFilter(*STAFF_ROLES))
+# answers to customers who try to use manager commands
+denied_router = RouterTemplate("denied")
 
-bot = Bot(token=api_token)
-storage = MemoryStorage()
-ds = Dispatcher(storage=storage)
-faker = Faker()
+MANAGER_COMMANDS = ("allbookings", "checkbookings", "checkbookingstoday", "backupreservations",
+                    "forcebooking", "bookbynumber", "importbookings", "export", "reloadtables")
 
 booking_requests = {}
+# references to running background tasks, so they are not garbage collected before they finish
+background_tasks = set()
+# number of rejected rows shown in import summary, the rest is only counted
+MAX_REJECTED_ROWS_IN_SUMMARY = 20
+
+
+def get_tables_file() -> Path:
+    return Path(os.path.dirname(__file__)) / Path("tables_distribution") / Path(os.getenv("TABLES_FILE"))
+
+
+def create_app(api_token: Optional[str] = None,
+               tables_file: Optional[str or Path] = None,
+               session: Optional[BaseSession] = None,
+               role_registry: Optional[RoleRegistry] = None,
+               rate_limiter: Optional[RateLimiter] = None) -> Tuple[Bot, Dispatcher]:
+    """
+    Create bot and dispatcher with all handlers and the tables storage attached.
+    Nothing is read from disk or network until this function is called.
+    Every call creates new routers, so several apps can be created in one process, e.g. in tests
+    :param api_token: token of the bot, TELEGRAM_API_TOKEN is used by default
+    :param tables_file: csv file with tables distribution, TABLES_FILE is used by default
+    :param session: custom session for the bot, e.g. for tests and benchmarks
+    :param role_registry: roles of chats and users, roles from environment are used by default
+    :param rate_limiter: limiter of requests per user, limiter from environment is used by default
+    :return:
+    """
+    tables_file = Path(tables_file or get_tables_file())
+    tables_storage = TablesStorage.from_csv_file(tables_file)
+    bot = Bot(token=api_token or os.getenv("TELEGRAM_API_TOKEN"), session=session)
+    listings_cache = ListingsCache(tables_storage)
+    ds = Dispatcher(storage=MemoryStorage(), tables_storage=tables_storage, listings_cache=listings_cache,
+                    tables_file=tables_file)
+    # middlewares are called in order of registration: duplicates are dropped before anything else is done,
+    # role is resolved before throttling, so managers and admins are not limited
+    ds.update.outer_middleware(DeduplicationMiddleware(RecentIds()))
+    ds.update.outer_middleware(RoleMiddleware(role_registry or RoleRegistry.from_env()))
+    ds.update.outer_middleware(ThrottlingMiddleware(rate_limiter or RateLimiter.from_env()))
+    ds.include_routers(manager_router.create_router(), denied_router.create_router(), router.create_router())
+    return bot, ds
+
+
+@lru_cache(maxsize=None)
+def get_faker():
+    # faker loads all locales on import, so it is imported only when the name is needed
+    from faker import Faker
+    return Faker()
 
 
 # Define the FSM states for each step
@@ -60,17 +115,14 @@ class ManagerStates(StatesGroup):
     waiting_for_date_manager = State()
     waiting_for_table_number = State()
     waiting_for_table_number_force = State()
+    waiting_for_import_file = State()
 
 
 """
 Part with utility functions for bot
 """
 async def print_table(table: Table, message: types.Message) -> None:
-    await message.answer(f"\nDate: {table.readable_booking_date},"
-                         f"\nTable №: {table.table_id},"
-                         f"\nNumber of seats: {table.capacity},"
-                         f"\nBooking time: {table.readable_booking_time},"
-                         f"\nName: {table.user_name}")
+    await message.answer(render_table_booking(table))
 
 
 async def get_requested_date(message: types.Message) -> Optional[datetime]:
@@ -88,63 +140,58 @@ Open chat with bot and type /book-table to start booking process
 """
 
 
-@ds.message(Command(commands=["help", "start"]))
-async def help_command(message: types.Message):
+@router.message(Command(commands=["help", "start"]))
+async def help_command(message: types.Message, role: Role):
     _logger.info("Help command is requested")
-    if await validate_chat_id(str(message.chat.id)):
+    if role == Role.CUSTOMER:
         await message.answer(customer_help)
     else:
         await message.answer(manager_help)
 
 
-@ds.message(Command("exit"))
+@router.message(Command("exit"))
 async def exit_command(message: types.Message, state: FSMContext):
     _logger.info("Exit command is requested")
     await message.answer("You have exited the process")
     await state.clear()
 
-@ds.message(Command("availabletables"))
+@router.message(Command("availabletables"))
 async def available_tables(message: types.Message, state: FSMContext):
     _logger.info("Available tables command is requested")
     await message.answer("Please provide date you want to check availability for. Format: DD.MM")
     await state.set_state(OrderStates.waiting_for_date_for_availability)
 
-@ds.message(Command("availabletablestoday"))
-async def available_tables_today(message: types.Message, state: FSMContext):
+@router.message(Command("availabletablestoday"))
+async def available_tables_today(message: types.Message, state: FSMContext, listings_cache: ListingsCache):
     _logger.info("Available tables for today command is requested")
     chosen_date = datetime.now()
-    tables_for_date = tables_storage.get_tables_for_date(chosen_date.date())
-    free_tables = [table for table in tables_for_date if not table.is_reserved]
+    free_tables = listings_cache.available_tables(chosen_date.date(), "today")
     if not free_tables:
         await message.answer("There are no available tables for today")
         return
-    for table in free_tables:
-        await message.answer(f"Available table for today: "
-                             f"\nID: {table.table_id}"
-                             f"\nNumber of seats: {table.capacity}")
+    for text in free_tables:
+        await message.answer(text)
     await state.clear()
 
-@ds.message(OrderStates.waiting_for_date_for_availability)
-async def process_date_for_availability(message: types.Message, state: FSMContext):
+@router.message(OrderStates.waiting_for_date_for_availability)
+async def process_date_for_availability(message: types.Message, state: FSMContext,
+                                        listings_cache: ListingsCache):
     _logger.info("Processing request particular date for checking availability")
     chosen_date = await get_requested_date(message)
     if chosen_date is None:
         await state.set_state(OrderStates.waiting_for_date_for_availability)
         return
-    tables_for_date = tables_storage.get_tables_for_date(chosen_date.date())
-    free_tables = [table for table in tables_for_date if not table.is_reserved]
+    free_tables = listings_cache.available_tables(chosen_date.date(), str(chosen_date.date()))
     if not free_tables:
         await message.answer("There are no available tables for this date")
         await state.clear()
         return
-    for table in free_tables:
-        await message.answer(f"Available table for {chosen_date.date()}: "
-                             f"\nID: {table.table_id}"
-                             f"\nNumber of seats: {table.capacity}")
+    for text in free_tables:
+        await message.answer(text)
     await state.clear()
 
 
-@ds.message(Command("booktable"))
+@router.message(Command("booktable"))
 async def book_table(message: types.Message, state: FSMContext):
     _logger.info("Start booking table")
     _logger.debug(message)
@@ -152,8 +199,8 @@ async def book_table(message: types.Message, state: FSMContext):
     await state.set_state(OrderStates.waiting_for_date_client)
 
 
-@ds.message(Command("booktabletoday"))
-async def book_table_today(message: types.Message, state: FSMContext):
+@router.message(Command("booktabletoday"))
+async def book_table_today(message: types.Message, state: FSMContext, tables_storage: TablesStorage):
     _logger.info("Start booking table for today")
     await message.answer("Please provide number of seats you need")
     chosen_date = datetime.now()
@@ -162,10 +209,10 @@ async def book_table_today(message: types.Message, state: FSMContext):
     await state.set_state(OrderStates.waiting_for_seats)
 
 
-@ds.message(Command("mybookings"))
-async def my_bookings(message: types.Message, state: FSMContext):
+@router.message(Command("mybookings"))
+async def my_bookings(message: types.Message, state: FSMContext, tables_storage: TablesStorage, role: Role):
     _logger.info("Start checking bookings")
-    if not await validate_chat_id(str(message.chat.id)):
+    if role != Role.CUSTOMER:
         await message.answer("You are not allowed to use this command")
         return
     all_tables = tables_storage.get_all_tables
@@ -181,15 +228,15 @@ async def my_bookings(message: types.Message, state: FSMContext):
     await state.clear()
 
 
-@ds.message(Command("customerrequest"))
+@router.message(Command("customerrequest"))
 async def customer_request(message: types.Message, state: FSMContext):
     _logger.info("Start customer request")
     await message.answer("Please provide your request")
     await state.set_state(OrderStates.waiting_for_request_message)
 
 
-@ds.message(OrderStates.waiting_for_request_message)
-async def process_request(message: types.Message, state: FSMContext):
+@router.message(OrderStates.waiting_for_request_message)
+async def process_request(message: types.Message, state: FSMContext, bot: Bot):
     _logger.info("Processing customer request")
     request = message.text
     await bot.send_message(chat_id=group_chat_id,
@@ -198,8 +245,8 @@ async def process_request(message: types.Message, state: FSMContext):
     await state.clear()
 
 
-@ds.message(OrderStates.waiting_for_date_client)
-async def process_date(message: types.Message, state: FSMContext):
+@router.message(OrderStates.waiting_for_date_client)
+async def process_date(message: types.Message, state: FSMContext, tables_storage: TablesStorage):
     _logger.info("Processing request particular date for booking")
     chosen_date = await get_requested_date(message)
     if chosen_date is None:
@@ -211,8 +258,8 @@ async def process_date(message: types.Message, state: FSMContext):
     await state.set_state(OrderStates.waiting_for_seats)
 
 
-@ds.message(OrderStates.waiting_for_seats)
-async def process_seats(message: types.Message, state: FSMContext):
+@router.message(OrderStates.waiting_for_seats)
+async def process_seats(message: types.Message, state: FSMContext, tables_storage: TablesStorage):
     _logger.info("Processing request for number of seats")
     seats = message.text
     seats = await validate_seats(seats)
@@ -233,7 +280,7 @@ async def process_seats(message: types.Message, state: FSMContext):
     await state.set_state(OrderStates.waiting_for_name)
 
 
-@ds.message(OrderStates.waiting_for_name)
+@router.message(OrderStates.waiting_for_name)
 async def process_name(message: types.Message, state: FSMContext):
     _logger.info("Processing user name")
     name = message.text
@@ -246,7 +293,7 @@ async def process_name(message: types.Message, state: FSMContext):
     await state.set_state(OrderStates.waiting_for_time)
 
 
-@ds.message(OrderStates.waiting_for_time)
+@router.message(OrderStates.waiting_for_time)
 async def process_time(message: types.Message, state: FSMContext):
     _logger.info("Processing booking time")
     data = await state.get_data()
@@ -266,8 +313,9 @@ async def process_time(message: types.Message, state: FSMContext):
     await state.set_state(OrderStates.waiting_for_confirmation)
 
 
-@ds.message(OrderStates.waiting_for_confirmation)
-async def process_confirmation(message: types.Message, state: FSMContext):
+@router.message(OrderStates.waiting_for_confirmation)
+async def process_confirmation(message: types.Message, state: FSMContext, tables_storage: TablesStorage,
+                               role: Role):
     _logger.info("Processing confirmation from client")
     data = await state.get_data()
     table = data["table"]
@@ -275,14 +323,12 @@ async def process_confirmation(message: types.Message, state: FSMContext):
     if confirmation == "YES":
         await message.answer(f"Table {table.table_id} for {table.capacity} "
                              f"seats is booked for {table.user_name} at {table.readable_booking_time}")
-        validation = await validate_chat_id(str(message.chat.id))
-        if validation:
+        if role == Role.CUSTOMER:
             booking_requests[table.table_id] = {"chat_id": message.chat.id, "table": table}
             await message.answer("Wait till manager confirm your booking")
-            await send_request_to_chat(message, table)
+            await send_request_to_chat(message.bot, message.from_user.username, table)
         else:
-            table.is_reserved = True
-            table.user_id = message.from_user.username
+            tables_storage.reserve_table(table, user_id=message.from_user.username)
             await message.answer("Booking is confirmed")
     else:
         table.user_name = None
@@ -292,9 +338,8 @@ async def process_confirmation(message: types.Message, state: FSMContext):
     await state.clear()
 
 
-async def send_request_to_chat(message: types.Message, table: Table) -> None:
+async def send_request_to_chat(bot: Bot, user: str, table: Table) -> None:
     _logger.info(f"Sending booking detail to separate chat {group_chat_id}")
-    user = message.from_user.username
     table.user_id = user
     keyboard = InlineKeyboardMarkup(
         inline_keyboard=[
@@ -310,14 +355,14 @@ async def send_request_to_chat(message: types.Message, table: Table) -> None:
                            reply_markup=keyboard)
 
 
-@ds.callback_query(lambda query: query.data.startswith("confirm_"))
-async def confirm_booking(query: types.CallbackQuery):
+@manager_router.callback_query(lambda query: query.data.startswith("confirm_"))
+async def confirm_booking(query: types.CallbackQuery, bot: Bot, tables_storage: TablesStorage):
     _logger.info("Manager confirmed booking")
     text = query.message.text
     match = re.search(r"Table №: (\d+)", text)
     table_id = int(match.group(1))
     table = booking_requests[table_id]["table"]
-    table.is_reserved = True
+    tables_storage.reserve_table(table)
     user_chat_id = booking_requests[table_id]["chat_id"]
     await bot.send_message(chat_id=user_chat_id,
                            text=f"Your booking is confirmed")
@@ -327,15 +372,98 @@ async def confirm_booking(query: types.CallbackQuery):
     booking_requests.pop(table_id)
 
 
-@ds.message(Command("cancelreservation"))
+"""
+Booking with inline keyboard. Date, seats and time are chosen with buttons in one message,
+which is edited on every step, so booking takes only a command and a few taps
+"""
+
+
+@router.message(Command("quickbook"))
+async def quick_book(message: types.Message, state: FSMContext, tables_storage: TablesStorage):
+    _logger.info("Start booking table with buttons")
+    await state.clear()
+    dates = tables_storage.get_dates_with_free_tables(datetime.now().date(), CALENDAR_DAYS)
+    if not dates:
+        await message.answer("There are no available tables in the next days")
+        return
+    await message.answer("Please choose date, number of seats and time of your booking",
+                         reply_markup=calendar_keyboard(dates))
+
+
+@router.callback_query(BookingDateCallback.filter())
+async def quick_book_date(query: types.CallbackQuery, callback_data: BookingDateCallback,
+                          tables_storage: TablesStorage):
+    _logger.info(f"Date {callback_data.day} is chosen for booking")
+    max_seats = tables_storage.get_free_capacity(parse_day(callback_data.day))
+    if not max_seats:
+        await query.answer("There are no available tables for this date", show_alert=True)
+        return
+    await query.message.edit_reply_markup(reply_markup=seats_keyboard(callback_data.day, max_seats))
+    await query.answer()
+
+
+@router.callback_query(BookingSeatsCallback.filter())
+async def quick_book_seats(query: types.CallbackQuery, callback_data: BookingSeatsCallback):
+    _logger.info(f"Table for {callback_data.seats} seats is chosen for booking")
+    slots = get_time_slots(parse_day(callback_data.day))
+    if not slots:
+        await query.answer("It is too late to book a table for this date", show_alert=True)
+        return
+    await query.message.edit_reply_markup(reply_markup=time_slots_keyboard(callback_data.day,
+                                                                            callback_data.seats, slots))
+    await query.answer()
+
+
+@router.callback_query(BookingTimeCallback.filter())
+async def quick_book_time(query: types.CallbackQuery, callback_data: BookingTimeCallback):
+    _logger.info(f"Time {callback_data.slot} is chosen for booking")
+    keyboard = confirmation_keyboard(callback_data.day, callback_data.seats,
+                                     callback_data.slot, query.from_user.full_name)
+    await query.message.edit_reply_markup(reply_markup=keyboard)
+    await query.answer()
+
+
+@router.callback_query(BookingConfirmCallback.filter())
+async def quick_book_confirm(query: types.CallbackQuery, callback_data: BookingConfirmCallback,
+                             tables_storage: TablesStorage, role: Role):
+    _logger.info("Processing confirmation of booking with buttons")
+    await query.message.edit_reply_markup(reply_markup=None)
+    if not callback_data.confirmed:
+        await query.answer("Booking is rejected")
+        return
+    business_date = parse_day(callback_data.day)
+    booking_time, text = await validate_time(f"{callback_data.slot[:2]}:{callback_data.slot[2:]}", business_date)
+    if booking_time is None:
+        await query.answer(text, show_alert=True)
+        return
+    # table is searched only now, because other bookings could be done while buttons were shown
+    table = tables_storage.search_for_table(callback_data.seats, tables_storage.get_tables_for_date(business_date))
+    if table is None:
+        await query.answer("Sorry, we don't have a table for this number of seats anymore", show_alert=True)
+        return
+    table.user_name = query.from_user.full_name
+    table.booking_time = booking_time
+    await query.answer()
+    text = (f"Table {table.table_id} for {table.capacity} seats is booked for {table.user_name} "
+            f"on {table.readable_booking_date} at {table.readable_booking_time}")
+    if role == Role.CUSTOMER:
+        booking_requests[table.table_id] = {"chat_id": query.message.chat.id, "table": table}
+        await query.message.answer(f"{text}\nWait till manager confirm your booking")
+        await send_request_to_chat(query.bot, query.from_user.username, table)
+    else:
+        tables_storage.reserve_table(table, user_id=query.from_user.username)
+        await query.message.answer(f"{text}\nBooking is confirmed")
+
+
+@router.message(Command("cancelreservation"))
 async def cancel_reservation(message: types.Message, state: FSMContext):
     _logger.info("Start cancelling reservation")
     await message.answer("Please provide date you want to cancel reservation for. Format: DD.MM")
     await state.set_state(OrderStates.wait_for_number_for_cancel)
 
 
-@ds.message(Command("cancelreservationtoday"))
-async def cancel_reservation_today(message: types.Message, state: FSMContext):
+@router.message(Command("cancelreservationtoday"))
+async def cancel_reservation_today(message: types.Message, state: FSMContext, tables_storage: TablesStorage):
     _logger.info("Start cancelling reservation for today")
     chosen_date = datetime.now()
     tables_for_date = tables_storage.get_tables_for_date(chosen_date.date())
@@ -344,8 +472,9 @@ async def cancel_reservation_today(message: types.Message, state: FSMContext):
     await state.set_state(OrderStates.waiting_cancel_reservation)
 
 
-@ds.message(OrderStates.wait_for_number_for_cancel)
-async def process_number_for_reservation_cancel(message: types.Message, state: FSMContext):
+@router.message(OrderStates.wait_for_number_for_cancel)
+async def process_number_for_reservation_cancel(message: types.Message, state: FSMContext,
+                                                tables_storage: TablesStorage, role: Role):
     _logger.info("Processing request for table number to cancel reservation")
     date = message.text
     chosen_date, text = await validate_date(date)
@@ -360,20 +489,21 @@ async def process_number_for_reservation_cancel(message: types.Message, state: F
         await state.clear()
         return
     await message.answer(f"Please provide table number you want to cancel reservation for.")
-    if not await validate_chat_id(str(message.chat.id)):
+    if role != Role.CUSTOMER:
         await message.answer(f"Available tables: {[table.table_id for table in tables]}")
     await state.set_data({"tables": tables})
     await state.set_state(OrderStates.waiting_cancel_reservation)
 
 
-@ds.message(OrderStates.waiting_cancel_reservation)
-async def process_cancel_reservation(message: types.Message, state: FSMContext):
+@router.message(OrderStates.waiting_cancel_reservation)
+async def process_cancel_reservation(message: types.Message, state: FSMContext,
+                                     tables_storage: TablesStorage, role: Role):
     _logger.info("Processing request for table number to cancel reservation")
     table_number = message.text
     user_id = message.from_user.username
     data = await state.get_data()
     tables = data["tables"]
-    if await validate_chat_id(str(message.chat.id)):
+    if role == Role.CUSTOMER:
         table = next((table for table in tables if table.table_id == int(table_number) and
                       table.user_id == user_id), None)
     else:
@@ -383,10 +513,7 @@ async def process_cancel_reservation(message: types.Message, state: FSMContext):
         await message.answer("Table with this number is not found or not reserved yet")
         await state.set_state(OrderStates.waiting_cancel_reservation)
         return
-    table.is_reserved = False
-    table.booking_time = None
-    table.user_name = None
-    table.user_id = None
+    tables_storage.release_table(table)
     await message.answer(f"Reservation for table №{table.table_id} is cancelled")
     await state.clear()
 
@@ -396,20 +523,20 @@ This part defines manager oriented part which might be used by manager to check
 """
 
 
-async def validate_chat_id(chat_id: str) -> bool:
-    _logger.debug(f"Chat id: {chat_id}")
-    _logger.debug(f"Allowed chat ids: {allowed_chat_ids}")
-    if chat_id not in allowed_chat_ids:
-        return True
-    return False
+@denied_router.message(Command(*MANAGER_COMMANDS))
+async def manager_command_denied(message: types.Message):
+    _logger.info(f"Manager command is requested by customer {message.from_user.username}")
+    await message.answer("You are not allowed to use this command")
+
 
+@denied_router.callback_query(lambda query: query.data.startswith("confirm_"))
+async def confirm_booking_denied(query: types.CallbackQuery):
+    await query.answer("You are not allowed to confirm bookings")
 
-@ds.message(Command("allbookings"))
-async def all_bookings(message: types.Message, state: FSMContext):
+
+@manager_router.message(Command("allbookings"))
+async def all_bookings(message: types.Message, state: FSMContext, tables_storage: TablesStorage):
     _logger.info("Start checking all bookings")
-    if await validate_chat_id(str(message.chat.id)):
-        await message.answer("You are not allowed to use this command")
-        return
     all_booked_tables = tables_storage.get_all_tables
     for date, bookings in all_booked_tables.items():
         for table in bookings:
@@ -419,79 +546,65 @@ async def all_bookings(message: types.Message, state: FSMContext):
     await state.clear()
 
 
-@ds.message(Command("checkbookings"))
+@manager_router.message(Command("checkbookings"))
 async def check_bookings(message: types.Message, state: FSMContext):
     _logger.info("Start checking bookings")
-    if await validate_chat_id(str(message.chat.id)):
-        await message.answer("You are not allowed to use this command")
-        return
     await message.answer("Please provide date you want to check bookings for. Format: DD.MM")
     await state.set_state(ManagerStates.waiting_for_date_manager)
 
 
-@ds.message(Command("checkbookingstoday"))
-async def check_bookings_today(message: types.Message, state: FSMContext):
+@manager_router.message(Command("checkbookingstoday"))
+async def check_bookings_today(message: types.Message, state: FSMContext, listings_cache: ListingsCache):
     _logger.info("Start checking bookings for today")
-    if await validate_chat_id(str(message.chat.id)):
-        await message.answer("You are not allowed to use this command")
-        return
     chosen_date = datetime.now()
-    tables_for_date = tables_storage.get_tables_for_date(chosen_date.date())
-    tables = [table for table in tables_for_date if table.is_reserved]
-    if not tables:
+    bookings = listings_cache.bookings(chosen_date.date())
+    if not bookings:
         await message.answer("There are no bookings for today")
         return
-    for table in tables:
-        await print_table(table, message)
+    for text in bookings:
+        await message.answer(text)
     await state.clear()
 
 
-@ds.message(ManagerStates.waiting_for_date_manager)
-async def process_date_manager(message: types.Message, state: FSMContext):
+@manager_router.message(ManagerStates.waiting_for_date_manager)
+async def process_date_manager(message: types.Message, state: FSMContext, listings_cache: ListingsCache):
     _logger.info("Processing request particular date for checking bookings")
     chosen_date = await get_requested_date(message)
     if chosen_date is None:
         await state.set_state(ManagerStates.waiting_for_date_manager)
         return
-    tables_for_date = tables_storage.get_tables_for_date(chosen_date.date())
-    tables = [table for table in tables_for_date if table.is_reserved]
-    if not tables:
+    bookings = listings_cache.bookings(chosen_date.date())
+    if not bookings:
         await message.answer("There are no bookings for this date")
         await state.clear()
         return
-    for table in tables:
-        await print_table(table, message)
+    for text in bookings:
+        await message.answer(text)
     await state.clear()
 
 
-@ds.message(Command("getid"))
+@router.message(Command("getid"))
 async def get_id(message: types.Message):
     ids = str(message.chat.id)
     _logger.info(f"Chat id: {ids}")
     await message.answer(ids)
 
 
-@ds.message(Command("backupreservations"))
-async def backup_reservations(message: types.Message):
-    if str(message.chat.id) not in allowed_chat_ids:
-        await message.answer("You are not allowed to use this command")
-        return
+@manager_router.message(Command("backupreservations"))
+async def backup_reservations(message: types.Message, tables_storage: TablesStorage):
     tables_storage.backup_to_csv_file(backup_csv_file)
     await message.answer("Backup is done")
 
 
-@ds.message(Command("forcebooking"))
+@manager_router.message(Command("forcebooking"))
 async def book_by_number(message: types.Message, state: FSMContext):
     _logger.info("Start booking table by number without name and time")
-    if await validate_chat_id(str(message.chat.id)):
-        await message.answer("You are not allowed to use this command")
-        return
     await message.answer("Please provide table number you want to book")
     await state.set_state(ManagerStates.waiting_for_table_number_force)
 
 
-@ds.message(ManagerStates.waiting_for_table_number_force)
-async def process_table_number(message: types.Message, state: FSMContext):
+@manager_router.message(ManagerStates.waiting_for_table_number_force)
+async def process_table_number(message: types.Message, state: FSMContext, tables_storage: TablesStorage):
     _logger.info("Processing request for table number to book by force")
     table_number = message.text
     chosen_date = datetime.now()
@@ -505,26 +618,21 @@ async def process_table_number(message: types.Message, state: FSMContext):
         await message.answer("Table is already reserved")
         await state.set_state(ManagerStates.waiting_for_table_number_force)
         return
-    table.is_reserved = True
-    table.user_name = faker.name()
-    table.booking_time = "N/A"
-    table.user_id = message.from_user.username
+    tables_storage.reserve_table(table, user_id=message.from_user.username,
+                                 user_name=get_faker().name(), booking_time="N/A")
     await message.answer(f"Table {table.table_id} is booked")
     await state.clear()
 
 
-@ds.message(Command("bookbynumber"))
+@manager_router.message(Command("bookbynumber"))
 async def book_by_number(message: types.Message, state: FSMContext):
     _logger.info("Start booking table by number")
-    if await validate_chat_id(str(message.chat.id)):
-        await message.answer("You are not allowed to use this command")
-        return
     await message.answer("Please provide table number you want to book")
     await state.set_state(ManagerStates.waiting_for_table_number)
 
 
-@ds.message(ManagerStates.waiting_for_table_number)
-async def process_table_number(message: types.Message, state: FSMContext):
+@manager_router.message(ManagerStates.waiting_for_table_number)
+async def process_table_number(message: types.Message, state: FSMContext, tables_storage: TablesStorage):
     _logger.info("Processing request for table number to book")
     table_number = message.text
     chosen_date = datetime.now()
@@ -543,10 +651,142 @@ async def process_table_number(message: types.Message, state: FSMContext):
     await state.set_state(OrderStates.waiting_for_name)
 
 
+@manager_router.message(Command("importbookings"))
+async def import_bookings(message: types.Message, state: FSMContext):
+    _logger.info("Start importing bookings from file")
+    await message.answer(f"Please send csv file with columns: {', '.join(IMPORT_FIELDS)}. "
+                         f"Format of date: DD.MM.YYYY, format of time: HH:MM")
+    await state.set_state(ManagerStates.waiting_for_import_file)
+
+
+@manager_router.message(ManagerStates.waiting_for_import_file)
+async def process_import_file(message: types.Message, state: FSMContext, bot: Bot, tables_storage: TablesStorage):
+    _logger.info("Processing file with bookings to import")
+    if message.document is None:
+        await message.answer("Please send csv file as a document")
+        await state.set_state(ManagerStates.waiting_for_import_file)
+        return
+    await state.clear()
+    buffer = io.BytesIO()
+    await bot.download(message.document, destination=buffer)
+    await message.answer("File is received, you will get a summary when import is finished")
+    # import runs in background, so other users are not waiting for it
+    task = asyncio.create_task(import_reservations_file(message, buffer, tables_storage))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+def read_reservations_csv(buffer: io.BytesIO) -> Tuple[dict, ...]:
+    buffer.seek(0)
+    with io.TextIOWrapper(buffer, encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        missing_fields = set(IMPORT_FIELDS) - set(reader.fieldnames or ())
+        if missing_fields:
+            raise ValueError(f"Columns {', '.join(sorted(missing_fields))} are missing")
+        return tuple(reader)
+
+
+async def import_reservations_file(message: types.Message, buffer: io.BytesIO, tables_storage: TablesStorage) -> None:
+    try:
+        # parsing is done in a thread, validation and booking is done in the loop,
+        # so no other handler can change tables in the middle of import
+        rows = await asyncio.to_thread(read_reservations_csv, buffer)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        _logger.warning(f"Failed to read file with bookings: {e}")
+        await message.answer(f"Failed to read file: {e}")
+        return
+    result = tables_storage.import_reservations(rows, user_id=message.from_user.username)
+    _logger.info(f"Import is finished. Accepted: {result.accepted}, rejected: {len(result.rejected)}")
+    summary = f"Import is finished.\nAccepted rows: {result.accepted}\nRejected rows: {len(result.rejected)}"
+    for line, reason in result.rejected[:MAX_REJECTED_ROWS_IN_SUMMARY]:
+        summary += f"\nLine {line}: {reason}"
+    if len(result.rejected) > MAX_REJECTED_ROWS_IN_SUMMARY:
+        summary += f"\n... and {len(result.rejected) - MAX_REJECTED_ROWS_IN_SUMMARY} more"
+    await message.answer(summary)
+
+
+@manager_router.message(Command("export"))
+async def export_bookings(message: types.Message, command: CommandObject, tables_storage: TablesStorage):
+    _logger.info("Start exporting bookings to file")
+    options, text = await validate_export_options(command.args, EXPORT_FORMATS)
+    if options is None:
+        await message.answer(text)
+        return
+    export_format, start_date, end_date = options
+    tables = tables_storage.iter_reserved_tables(start_date, end_date)
+    buffer = io.BytesIO()
+    write = write_csv if export_format == CSV_FORMAT else write_ics
+    count = write(tables, buffer)
+    if not count:
+        await message.answer("There are no bookings for this period")
+        return
+    period = f"{start_date.strftime('%d.%m.%Y')}-{end_date.strftime('%d.%m.%Y') if end_date else 'all'}"
+    await message.answer_document(BufferedInputFile(buffer.getvalue(), filename=f"bookings_{period}.{export_format}"),
+                                  caption=f"Bookings exported: {count}")
+
+
+def format_reload_result(result: ReloadResult) -> str:
+    text = (f"Tables are reloaded."
+            f"\nAdded tables: {result.added or 'none'}"
+            f"\nRemoved tables: {result.removed or 'none'}"
+            f"\nResized tables: {result.resized or 'none'}")
+    if result.orphaned:
+        text += "\nThese reservations don't fit new tables and are kept till cancellation:"
+        for table in result.orphaned:
+            text += f"\n{table.readable_booking_date} table №{table.table_id} for {table.user_name}"
+    return text
+
+
+@manager_router.message(Command("reloadtables"))
+async def reload_tables(message: types.Message, tables_storage: TablesStorage, tables_file: Path):
+    _logger.info(f"Reloading tables from {tables_file}")
+    try:
+        result = tables_storage.reload_from_csv_file(tables_file)
+    except (OSError, KeyError, ValueError, csv.Error) as e:
+        _logger.exception("Failed to reload tables")
+        await message.answer(f"Failed to reload tables: {e}")
+        return
+    await message.answer(format_reload_result(result))
+
+
+async def watch_tables_file(bot: Bot, tables_storage: TablesStorage, tables_file: Path, interval: float) -> None:
+    """
+    Reload tables when tables distribution file is changed and notify managers about result
+    :param bot:
+    :param tables_storage:
+    :param tables_file:
+    :param interval: how often file is checked, in seconds
+    :return:
+    """
+    mtime = os.stat(tables_file).st_mtime
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            new_mtime = os.stat(tables_file).st_mtime
+            if new_mtime == mtime:
+                continue
+            mtime = new_mtime
+            result = tables_storage.reload_from_csv_file(tables_file)
+        except (OSError, KeyError, ValueError, csv.Error):
+            _logger.exception("Failed to reload tables")
+            continue
+        _logger.info(f"Tables are reloaded from {tables_file}")
+        await bot.send_message(chat_id=group_chat_id, text=format_reload_result(result))
+
+
 async def main():
+    logging.config.dictConfig(log_config)
+    bot, ds = create_app()
+    tables_storage: TablesStorage = ds["tables_storage"]
     try:
         if os.path.exists(backup_csv_file):
             tables_storage.upload_backup_file(backup_csv_file)
+        watch_interval = os.getenv("TABLES_FILE_WATCH_INTERVAL")
+        if watch_interval:
+            task = asyncio.create_task(watch_tables_file(bot, tables_storage, ds["tables_file"],
+                                                         float(watch_interval)))
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
         await ds.start_polling(bot)
     except Exception as e:
         _logger.exception("Error while polling")
@@ -0,0 +1,105 @@
+"""
+Front end of the bot for several venues. It receives updates from Telegram and forwards
+every update to the worker process of the venue chosen in the chat, see sharding.py
+"""
+import asyncio
+import logging.config
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+from aiogram import Bot, Dispatcher, Router, types
+from aiogram.filters import Command
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from logging_conf import log_config
+from sharding import Venue, VenueRouting, VenueShard, read_venues_csv
+
+_logger = logging.getLogger(__name__)
+
+router = Router()
+
+
+class VenueCallback(CallbackData, prefix="venue"):
+    name: str
+
+
+def venues_keyboard(venues: Tuple[Venue, ...]) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=venue.name, callback_data=VenueCallback(name=venue.name).pack())]
+        for venue in venues
+    ])
+
+
+@router.message(Command("venue"))
+async def choose_venue(message: types.Message, venue_routing: VenueRouting):
+    _logger.info("Venue choice is requested")
+    venues = tuple(shard.venue for shard in venue_routing.shards.values())
+    await message.answer("Please choose the restaurant", reply_markup=venues_keyboard(venues))
+
+
+@router.callback_query(VenueCallback.filter())
+async def process_venue(query: types.CallbackQuery, callback_data: VenueCallback, venue_routing: VenueRouting):
+    if callback_data.name not in venue_routing.shards:
+        await query.answer("This restaurant is not available anymore", show_alert=True)
+        return
+    if query.message is None:
+        await query.answer("Message is too old, please use /venue again", show_alert=True)
+        return
+    if not venue_routing.choose(query.message.chat.id, callback_data.name):
+        await query.answer("Chat of managers can't change its restaurant", show_alert=True)
+        return
+    await query.message.edit_reply_markup(reply_markup=None)
+    await query.answer()
+    await query.message.answer(f"Restaurant {callback_data.name} is chosen. Type /help to see available commands")
+
+
+@router.message()
+@router.callback_query()
+async def forward_to_venue(event: types.Message or types.CallbackQuery, event_update: types.Update,
+                           event_chat: Optional[types.Chat], venue_routing: VenueRouting):
+    shard = venue_routing.get_shard(event_chat.id) if event_chat else None
+    if shard is None:
+        if isinstance(event, types.CallbackQuery):
+            # callback of inline message or of too old message has no message to answer to
+            await event.answer("Please choose the restaurant with /venue first", show_alert=True)
+            return
+        message = event
+        venues = tuple(item.venue for item in venue_routing.shards.values())
+        await message.answer("Please choose the restaurant first", reply_markup=venues_keyboard(venues))
+        return
+    if not shard.forward(event_update.model_dump(mode="json", exclude_none=True)):
+        await event.answer("Restaurant is not available now, please try later")
+
+
+def create_front_app(venues: Tuple[Venue, ...], api_token: Optional[str] = None) -> Tuple[Bot, Dispatcher]:
+    """
+    Create bot and dispatcher of front end, shards are created but not started
+    :param venues:
+    :param api_token: token of the bot, TELEGRAM_API_TOKEN is used by default
+    :return:
+    """
+    shards = {venue.name: VenueShard(venue) for venue in venues}
+    bot = Bot(token=api_token or os.getenv("TELEGRAM_API_TOKEN"))
+    ds = Dispatcher(venue_routing=VenueRouting(shards))
+    ds.include_router(router)
+    return bot, ds
+
+
+async def main():
+    logging.config.dictConfig(log_config)
+    venues_file = Path(os.path.dirname(__file__)) / Path("tables_distribution") / Path(os.getenv("VENUES_FILE"))
+    bot, ds = create_front_app(read_venues_csv(venues_file))
+    shards = ds["venue_routing"].shards.values()
+    for shard in shards:
+        shard.start()
+    try:
+        await ds.start_polling(bot)
+    finally:
+        # shards backup their reservations when they are stopped
+        await asyncio.gather(*(shard.stop() for shard in shards))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,243 @@
+import asyncio
+import copy
+import csv
+import logging.config
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from logging_conf import log_config
+
+_logger = logging.getLogger(__name__)
+
+# how long shard has to finish handling of updates and backup reservations when it is stopped, in seconds
+SHARD_STOP_TIMEOUT = 30
+# number of updates waiting to be sent to a shard, new updates are rejected when it is full
+SHARD_QUEUE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Venue:
+    name: str
+    tables_file: str
+    # chat of managers of the venue, GROUP_CHAT_ID is used if it is not set and there is only one venue
+    group_chat_id: Optional[str] = None
+
+
+def read_venues_csv(file_path: str or Path) -> Tuple[Venue, ...]:
+    """
+    Read venues from csv file with columns venue, tables_file and group_chat_id.
+    Tables files are searched in tables_distribution folder, as TABLES_FILE.
+    If there are several venues, every venue needs its own chat of managers,
+    otherwise bookings of one venue could be confirmed in another
+    :param file_path:
+    :return:
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        reader = csv.DictReader(file)
+        venues = tuple(Venue(name=row["venue"].strip(), tables_file=row["tables_file"].strip(),
+                             group_chat_id=(row.get("group_chat_id") or "").strip() or None)
+                       for row in reader)
+    names = [venue.name for venue in venues]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Venue names should be unique, got: {names}")
+    if len(venues) > 1:
+        chats = [venue.group_chat_id for venue in venues]
+        if None in chats or len(set(chats)) != len(chats):
+            raise ValueError(f"Every venue should have its own group_chat_id, got: {chats}")
+    return venues
+
+
+class VenueRouting:
+    """
+    Keeps shards of venues and venue chosen in every chat.
+    Chats of managers are bound to their venues from config and can't choose another venue
+    """
+
+    def __init__(self, shards: Dict[str, 'VenueShard']):
+        self.shards = shards
+        self._manager_chats: Dict[int, str] = {
+            int(shard.venue.group_chat_id): name for name, shard in shards.items() if shard.venue.group_chat_id
+        }
+        self._chat_venues: Dict[int, str] = {}
+
+    def choose(self, chat_id: int, venue_name: str) -> bool:
+        """
+        Bind chat to the venue
+        :param chat_id:
+        :param venue_name:
+        :return: False if chat is a chat of managers, which is always bound to its venue
+        """
+        if chat_id in self._manager_chats:
+            return False
+        self._chat_venues[chat_id] = venue_name
+        return True
+
+    def get_shard(self, chat_id: int) -> Optional['VenueShard']:
+        if len(self.shards) == 1:
+            return next(iter(self.shards.values()))
+        venue_name = self._manager_chats.get(chat_id) or self._chat_venues.get(chat_id)
+        return self.shards.get(venue_name) if venue_name else None
+
+
+async def _feed_update(ds, bot, update: dict) -> None:
+    try:
+        await ds.feed_raw_update(bot, update)
+    except Exception:
+        _logger.exception(f"Failed to process update {update.get('update_id')}")
+
+
+async def serve_shard(conn: Connection, venue: Venue) -> None:
+    """
+    Handle updates received from front end until None is received or front end is closed
+    :param conn: end of the pipe from front end
+    :param venue:
+    :return:
+    """
+    import run_bot
+
+    tables_file = Path(os.path.dirname(__file__)) / Path("tables_distribution") / Path(venue.tables_file)
+    bot, ds = run_bot.create_app(tables_file=tables_file)
+    tables_storage = ds["tables_storage"]
+    if os.path.exists(run_bot.backup_csv_file):
+        tables_storage.upload_backup_file(run_bot.backup_csv_file)
+    watcher = None
+    watch_interval = os.getenv("TABLES_FILE_WATCH_INTERVAL")
+    if watch_interval:
+        # changes of tables file of the venue are reported to managers of the venue
+        watcher = asyncio.create_task(run_bot.watch_tables_file(bot, tables_storage, ds["tables_file"],
+                                                                float(watch_interval)))
+    loop = asyncio.get_running_loop()
+    tasks = set()
+    try:
+        while True:
+            try:
+                update = await loop.run_in_executor(None, conn.recv)
+            except EOFError:
+                _logger.warning("Front end is closed")
+                break
+            if update is None:
+                break
+            # updates are handled concurrently, as in polling of a single bot
+            task = asyncio.create_task(_feed_update(ds, bot, update))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if watcher:
+            watcher.cancel()
+        tables_storage.backup_to_csv_file(run_bot.backup_csv_file)
+        await bot.session.close()
+        _logger.info(f"Shard of venue {venue.name} is stopped")
+
+
+def run_shard(conn: Connection, venue: Venue) -> None:
+    """
+    Entry point of worker process of the venue
+    :param conn:
+    :param venue:
+    :return:
+    """
+    # run_bot reads these variables on import, so they are set before it is imported
+    if venue.group_chat_id:
+        os.environ["GROUP_CHAT_ID"] = venue.group_chat_id
+    os.environ["BACKUP_FILE"] = f"./backup_tables_{venue.name}.csv"
+    config = copy.deepcopy(log_config)
+    config["handlers"]["file_handler"]["filename"] = f"bot_logs_{venue.name}.log"
+    logging.config.dictConfig(config)
+    asyncio.run(serve_shard(conn, venue))
+
+
+class VenueShard:
+    """
+    Worker process with storage and handlers of one venue. Updates are sent to it through a pipe,
+    answers are sent by the worker directly to Telegram, so nothing is sent back.
+    Pipe is written from a separate thread of the shard, so a worker which doesn't read updates
+    blocks only its own queue and not the event loop of the front end
+    """
+
+    def __init__(self, venue: Venue, target: Callable[[Connection, Venue], None] = run_shard,
+                 queue_size: int = SHARD_QUEUE_SIZE):
+        self.venue = venue
+        self._target = target
+        self._queue_size = queue_size
+        self._conn: Optional[Connection] = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sender: Optional[asyncio.Task] = None
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        """
+        Start worker process and task which sends updates to it, has to be called in running event loop
+        :return:
+        """
+        # spawn is used, so worker does not inherit bot objects and state of front end
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=self._target, args=(child_conn, self.venue),
+                                        name=f"venue-{self.venue.name}")
+        self._process.start()
+        child_conn.close()
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"venue-{self.venue.name}")
+        self._sender = asyncio.create_task(self._send_updates())
+        _logger.info(f"Shard of venue {self.venue.name} is started, pid {self._process.pid}")
+
+    async def _send_updates(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            update = await self._queue.get()
+            try:
+                await loop.run_in_executor(self._executor, self._conn.send, update)
+            except OSError:
+                _logger.exception(f"Failed to send update to shard of venue {self.venue.name}")
+            if update is None:
+                return
+
+    def forward(self, update: dict) -> bool:
+        """
+        Put update to the queue of the worker
+        :param update: raw update as it is received from Telegram
+        :return: False if worker is not running or its queue is full
+        """
+        if not self.is_alive:
+            _logger.error(f"Shard of venue {self.venue.name} is not running")
+            return False
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            _logger.error(f"Queue of shard of venue {self.venue.name} is full, update is rejected")
+            return False
+        return True
+
+    async def stop(self, timeout: float = SHARD_STOP_TIMEOUT) -> None:
+        """
+        Send queued updates to the worker, stop it and wait till it finishes
+        :param timeout:
+        :return:
+        """
+        if self._process is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.put(None), timeout)
+            await asyncio.wait_for(asyncio.shield(self._sender), timeout)
+        except asyncio.TimeoutError:
+            _logger.warning(f"Shard of venue {self.venue.name} doesn't receive updates")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._process.join, timeout)
+        if self._process.is_alive():
+            _logger.warning(f"Shard of venue {self.venue.name} is not stopped in time, terminating it")
+            self._process.terminate()
+        self._sender.cancel()
+        self._executor.shutdown(wait=False)
+        self._conn.close()
+        self._process = None
@@ -0,0 +1,55 @@
+import csv
+import io
+from datetime import date, datetime, timedelta
+
+from exporters import write_csv, write_ics
+from restaurant_space import TablesStorage
+
+
+def reserve_tables(tables_storage: TablesStorage) -> date:
+    business_date = date.today() + timedelta(days=1)
+    tables = tables_storage.get_tables_for_date(business_date)
+    tables_storage.reserve_table(tables_storage.search_for_table(4, tables), user_id="user", user_name="Name, Jr",
+                                 booking_time=datetime.combine(business_date, datetime.min.time()).replace(hour=19))
+    tables_storage.reserve_table(tables_storage.search_for_table(2, tables), user_name="Force", booking_time="N/A")
+    return business_date
+
+
+def test_csv_export_can_be_imported(tables_storage: TablesStorage, available_tables):
+    reserve_tables(tables_storage)
+    buffer = io.BytesIO()
+    assert write_csv(tables_storage.iter_reserved_tables(), buffer) == 2, "Both reservations should be exported"
+    rows = list(csv.DictReader(io.StringIO(buffer.getvalue().decode("utf-8"))))
+    assert rows[0]["booking_time"] == "19:00" and rows[0]["user_name"] == "Name, Jr"
+    assert rows[1]["booking_time"] == "", "Force booking has no time"
+    result = TablesStorage(available_tables).import_reservations(rows)
+    assert result.accepted == 2 and not result.rejected, "Exported file should be imported without errors"
+
+
+def test_ics_export(tables_storage: TablesStorage):
+    business_date = reserve_tables(tables_storage)
+    buffer = io.BytesIO()
+    assert write_ics(tables_storage.iter_reserved_tables(end_date=date.today()), buffer) == 0, "No bookings for today"
+    buffer = io.BytesIO()
+    assert write_ics(tables_storage.iter_reserved_tables(start_date=business_date), buffer) == 2
+    lines = buffer.getvalue().decode("utf-8").split("\r\n")
+    assert lines[0] == "BEGIN:VCALENDAR" and lines[-2] == "END:VCALENDAR"
+    day = business_date.strftime("%Y%m%d")
+    assert f"DTSTART:{day}T190000" in lines and f"DTEND:{day}T200000" in lines
+    assert f"DTSTART;VALUE=DATE:{day}" in lines, "Booking without time should be all day event"
+    assert "SUMMARY:Table 1 (4 seats): Name\\, Jr" in lines, "Comma should be escaped"
+
+
+def test_ics_long_lines_are_folded(tables_storage: TablesStorage):
+    business_date = date.today() + timedelta(days=1)
+    user_name = "Очень длинное имя гостя " * 5
+    tables_storage.reserve_table(tables_storage.get_tables_for_date(business_date)[0], user_name=user_name,
+                                 booking_time="N/A")
+    buffer = io.BytesIO()
+    write_ics(tables_storage.iter_reserved_tables(), buffer)
+    lines = buffer.getvalue().split(b"\r\n")
+    assert all(len(line) <= 75 for line in lines), "Lines should not be longer than 75 octets"
+    # unfolding restores original lines, multibyte characters are not split
+    text = buffer.getvalue().decode("utf-8").replace("\r\n ", "")
+    assert f"SUMMARY:Table 1 (4 seats): {user_name}" in text.split("\r\n")
+
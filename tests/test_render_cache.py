@@ -0,0 +1,30 @@
+from datetime import date, timedelta
+
+from render_cache import LRUCache, ListingsCache
+from restaurant_space import TablesStorage
+
+
+def test_lru_cache_is_bounded():
+    cache = LRUCache(maxsize=2)
+    cache.get_or_create("a", lambda: 1)
+    cache.get_or_create("b", lambda: 2)
+    cache.get_or_create("a", lambda: 3)
+    cache.get_or_create("c", lambda: 4)
+    assert len(cache) == 2, "Cache should not grow over max size"
+    assert cache.get_or_create("a", lambda: 5) == 1, "Recently used entry should be kept"
+    assert cache.get_or_create("b", lambda: 6) == 6, "Least recently used entry should be evicted"
+    assert cache.hits == 2 and cache.misses == 4
+
+
+def test_listings_are_cached_until_date_changes(tables_storage: TablesStorage):
+    business_date = date.today() + timedelta(days=1)
+    listings_cache = ListingsCache(tables_storage)
+    available = listings_cache.available_tables(business_date, "tomorrow")
+    assert len(available) == 2, "Both tables should be available"
+    assert listings_cache.available_tables(business_date, "tomorrow") is available, "Listing should be cached"
+    assert listings_cache.hit_rate == 0.5
+    table = tables_storage.search_for_table(4, tables_storage.get_tables_for_date(business_date))
+    tables_storage.reserve_table(table, user_name="Name", booking_time="N/A")
+    assert len(listings_cache.available_tables(business_date, "tomorrow")) == 1, "Reserved table is not available"
+    bookings = listings_cache.bookings(business_date)
+    assert len(bookings) == 1 and "Name: Name" in bookings[0], "Reserved table should be in bookings"
@@ -0,0 +1,32 @@
+import os
+import time
+from pathlib import Path
+
+from roles import Role, RoleRegistry, RoleSet, parse_ids
+
+
+def test_parse_ids():
+    assert parse_ids("1, 2,3  4") == frozenset({"1", "2", "3", "4"}), "Ids should be split by commas and spaces"
+    assert parse_ids(None) == frozenset()
+
+
+def test_resolve_role():
+    roles = RoleSet(managers=frozenset({"-100", "7"}), admins=frozenset({"42"}))
+    assert roles.resolve(-100, 1) == Role.MANAGER, "Group chat should give manager role"
+    assert roles.resolve(5, 7) == Role.MANAGER, "Manager user in private chat should be resolved"
+    assert roles.resolve(-100, 42) == Role.ADMIN, "The highest role should be used"
+    assert roles.resolve(5, 6) == Role.CUSTOMER
+
+
+def test_roles_file_is_reloaded(tmp_path: Path):
+    roles_file = tmp_path / "roles.csv"
+    roles_file.write_text("id,role\n7,manager\n", encoding="utf-8")
+    registry = RoleRegistry(RoleSet(managers=frozenset({"-100"})), roles_file, check_interval=0)
+    assert registry.resolve(5, 7) == Role.MANAGER, "Role from file should be used"
+    assert registry.resolve(-100, None) == Role.MANAGER, "Role from environment should be kept"
+    roles_file.write_text("id,role\n7,admin\n", encoding="utf-8")
+    mtime = time.time() + 10
+    os.utime(roles_file, (mtime, mtime))
+    assert registry.resolve(5, 7) == Role.ADMIN, "Changed file should be re-read"
+    roles_file.unlink()
+    assert registry.resolve(5, 7) == Role.CUSTOMER, "Roles from removed file should be dropped"
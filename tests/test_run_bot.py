@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram import methods, types  # noqa: E402
+from aiogram.client.session.base import BaseSession  # noqa: E402
+
+from restaurant_space import ReloadResult  # noqa: E402
+from roles import RoleRegistry, RoleSet  # noqa: E402
+from run_bot import create_app, format_reload_result  # noqa: E402
+from text_for_helps import customer_help  # noqa: E402
+from throttling import RateLimiter  # noqa: E402
+
+# token is never sent anywhere, it only has to pass aiogram format validation
+FAKE_TOKEN = "123456:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA"
+MANAGER_ID = 7
+
+
+class RecordingSession(BaseSession):
+    # session which stores requests of the bot instead of sending them
+
+    def __init__(self):
+        super().__init__()
+        self.requests: List[methods.TelegramMethod] = []
+
+    async def make_request(self, bot, method, timeout=None):
+        self.requests.append(method)
+        return None
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def command_update(update_id: int, user_id: int, text: str) -> types.Update:
+    return types.Update(
+        update_id=update_id,
+        message=types.Message(message_id=update_id, date=datetime.now(),
+                              chat=types.Chat(id=user_id, type="private"),
+                              from_user=types.User(id=user_id, is_bot=False, first_name="Guest"),
+                              text=text))
+
+
+def sent_texts(session: RecordingSession) -> List[str]:
+    return [request.text for request in session.requests if isinstance(request, methods.SendMessage)]
+
+
+def test_create_app_handles_updates(tables_distribution_csv_file: Path):
+    role_registry = RoleRegistry(RoleSet(managers=frozenset({str(MANAGER_ID)})))
+
+    async def run():
+        sessions = []
+        # every app gets its own routers, so the app can be created several times
+        for _ in range(2):
+            session = RecordingSession()
+            bot, ds = create_app(api_token=FAKE_TOKEN, tables_file=tables_distribution_csv_file,
+                                 session=session, role_registry=role_registry)
+            await ds.feed_update(bot, command_update(1, 1, "/help"))
+            await ds.feed_update(bot, command_update(2, 1, "/reloadtables"))
+            await ds.feed_update(bot, command_update(3, MANAGER_ID, "/reloadtables"))
+            sessions.append(session)
+        return sessions
+
+    for session in asyncio.run(run()):
+        assert sent_texts(session) == [customer_help, "You are not allowed to use this command",
+                                       format_reload_result(ReloadResult())]
+
+
+def test_managers_are_not_throttled(tables_distribution_csv_file: Path):
+    role_registry = RoleRegistry(RoleSet(managers=frozenset({str(MANAGER_ID)})))
+    session = RecordingSession()
+
+    async def run():
+        bot, ds = create_app(api_token=FAKE_TOKEN, tables_file=tables_distribution_csv_file, session=session,
+                             role_registry=role_registry, rate_limiter=RateLimiter(capacity=2))
+        for update_id in range(3):
+            await ds.feed_update(bot, command_update(update_id, MANAGER_ID, "/reloadtables"))
+        for update_id in range(3, 6):
+            await ds.feed_update(bot, command_update(update_id, 1, "/help"))
+
+    asyncio.run(run())
+    assert sent_texts(session) == [format_reload_result(ReloadResult())] * 3 + [customer_help] * 2 + [
+        "Too many requests. Please wait a bit and try again"]
+
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from sharding import Venue, VenueRouting, VenueShard, read_venues_csv
+
+
+def test_read_venues_csv(tmp_path: Path):
+    venues_file = tmp_path / "venues.csv"
+    venues_file.write_text("venue,tables_file,group_chat_id\n"
+                           "center,tables.csv,-100\n"
+                           "terrace,terrace.csv,-200\n", encoding="utf-8")
+    assert read_venues_csv(venues_file) == (Venue("center", "tables.csv", "-100"),
+                                            Venue("terrace", "terrace.csv", "-200"))
+
+
+def test_single_venue_without_group_chat(tmp_path: Path):
+    venues_file = tmp_path / "venues.csv"
+    venues_file.write_text("venue,tables_file,group_chat_id\ncenter,tables.csv,\n", encoding="utf-8")
+    assert read_venues_csv(venues_file) == (Venue("center", "tables.csv", None),)
+
+
+def test_venue_names_are_unique(tmp_path: Path):
+    venues_file = tmp_path / "venues.csv"
+    venues_file.write_text("venue,tables_file\ncenter,tables.csv\ncenter,other.csv\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_venues_csv(venues_file)
+
+
+@pytest.mark.parametrize("chats", [("-100", ""), ("-100", "-100")])
+def test_every_venue_has_own_group_chat(tmp_path: Path, chats):
+    venues_file = tmp_path / "venues.csv"
+    venues_file.write_text("venue,tables_file,group_chat_id\n"
+                           f"center,tables.csv,{chats[0]}\n"
+                           f"terrace,terrace.csv,{chats[1]}\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        read_venues_csv(venues_file)
+
+
+def test_venue_routing():
+    shards = {name: VenueShard(Venue(name, "tables.csv", chat))
+              for name, chat in (("center", "-100"), ("terrace", "-200"))}
+    venue_routing = VenueRouting(shards)
+    assert venue_routing.get_shard(-100) is shards["center"]
+    assert venue_routing.get_shard(-200) is shards["terrace"]
+    assert venue_routing.get_shard(1) is None
+
+    assert venue_routing.choose(1, "terrace")
+    assert venue_routing.get_shard(1) is shards["terrace"]
+    assert venue_routing.choose(1, "center")
+    assert venue_routing.get_shard(1) is shards["center"]
+
+    # chat of managers can't be moved to another venue
+    assert not venue_routing.choose(-100, "terrace")
+    assert venue_routing.get_shard(-100) is shards["center"]
+
+
+def test_single_venue_routing():
+    shard = VenueShard(Venue("center", "tables.csv"))
+    assert VenueRouting({"center": shard}).get_shard(1) is shard
+
+
+def write_updates(conn, venue: Venue) -> None:
+    # worker of test shards, it writes received updates to the file given as tables file
+    updates = []
+    while True:
+        update = conn.recv()
+        if update is None:
+            break
+        updates.append(update)
+    Path(venue.tables_file).write_text(json.dumps(updates), encoding="utf-8")
+
+
+def test_shard_forwards_updates(tmp_path: Path):
+    received_file = tmp_path / "updates.json"
+    updates = [{"update_id": update_id} for update_id in range(3)]
+
+    async def run():
+        shard = VenueShard(Venue("center", str(received_file)), target=write_updates)
+        assert not shard.forward(updates[0])
+        shard.start()
+        assert shard.is_alive
+        for update in updates:
+            assert shard.forward(update)
+        await shard.stop(timeout=10)
+        assert not shard.is_alive
+
+    asyncio.run(run())
+    assert json.loads(received_file.read_text(encoding="utf-8")) == updates
+
+
+def test_update_survives_forwarding():
+    types = pytest.importorskip("aiogram.types")
+    update = types.Update(
+        update_id=1,
+        callback_query=types.CallbackQuery(
+            id="1", chat_instance="1", data="confirm_1",
+            from_user=types.User(id=1, is_bot=False, first_name="Manager"),
+            message=types.Message(message_id=1, date=datetime(2030, 1, 1, 12),
+                                  chat=types.Chat(id=-100, type="group"), text="Booking")))
+    raw = update.model_dump(mode="json", exclude_none=True)
+    restored = types.Update.model_validate(json.loads(json.dumps(raw)))
+    assert restored.callback_query.data == "confirm_1"
+    assert restored.callback_query.message.chat.id == -100
+    assert restored.model_dump(mode="json", exclude_none=True) == raw
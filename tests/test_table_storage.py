@@ -1,4 +1,6 @@
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+
+import pytest
 
 from restaurant_space import Table, TablesStorage
 
@@ -33,4 +35,118 @@ def test_save_to_file(tables_distribution_csv_file: str, backup_csv_file: str):
     tables_storage.upload_backup_file(backup_csv_file)
     tables = tables_storage.get_tables_for_date(business_date)
     assert next(filter(lambda t: t.capacity == 4, tables), None).is_reserved, "Table with capacity 4 should be reserved"
-    assert not tables_storage.search_for_table(6, tables).is_reserved, "Table with capacity 6 should not be reserved"
\ No newline at end of file
+    assert not tables_storage.search_for_table(6, tables).is_reserved, "Table with capacity 6 should not be reserved"
+
+def test_version_is_bumped_on_changes(tables_storage: TablesStorage):
+    business_date = date.today() + timedelta(days=1)
+    tables = tables_storage.get_tables_for_date(business_date)
+    assert tables_storage.get_version(business_date) == 0, "Version of new date should be 0"
+    table = tables_storage.search_for_table(4, tables)
+    tables_storage.reserve_table(table, user_id="user", user_name="Name")
+    assert table.is_reserved and table.user_name == "Name", "Table should be reserved for Name"
+    assert tables_storage.get_version(business_date) == 1, "Version should be bumped after reservation"
+    tables_storage.release_table(table)
+    assert not table.is_reserved and table.user_id is None, "Reservation should be cancelled"
+    assert tables_storage.get_version(business_date) == 2, "Version should be bumped after cancellation"
+    assert tables_storage.get_version(date.today()) == 0, "Other dates should not be affected"
+
+
+def test_free_capacity(tables_storage: TablesStorage):
+    business_date = date.today() + timedelta(days=1)
+    assert tables_storage.get_free_capacity(business_date) == 4, "Biggest table should be free for new date"
+    tables = tables_storage.get_tables_for_date(business_date)
+    tables_storage.reserve_table(tables_storage.search_for_table(4, tables))
+    assert tables_storage.get_free_capacity(business_date) == 2, "Only table with capacity 2 should be free"
+    tables_storage.reserve_table(tables_storage.search_for_table(2, tables))
+    assert tables_storage.get_free_capacity(business_date) == 0, "All tables should be reserved"
+    dates = tables_storage.get_dates_with_free_tables(date.today(), 3)
+    assert dates == (date.today(), date.today() + timedelta(days=2)), "Fully booked date should be skipped"
+
+
+def test_import_reservations(tables_storage: TablesStorage):
+    business_date = date.today() + timedelta(days=1)
+    day = business_date.strftime("%d.%m.%Y")
+    past_day = (date.today() - timedelta(days=1)).strftime("%d.%m.%Y")
+    rows = [{"date": day, "table_id": "1", "booking_time": "19:00", "user_name": "Name"},
+            {"date": day, "table_id": "1", "booking_time": "20:00", "user_name": "Other"},
+            {"date": day, "table_id": "3", "booking_time": "19:00", "user_name": "Name"},
+            {"date": past_day, "table_id": "2", "booking_time": "19:00", "user_name": "Name"},
+            {"date": "tomorrow", "table_id": "2", "booking_time": "", "user_name": "Name"},
+            {"date": day, "table_id": "2", "booking_time": "", "user_name": "Name"}]
+    result = tables_storage.import_reservations(rows, user_id="manager")
+    assert result.accepted == 2, "Only first and last rows are valid"
+    assert [line for line, _ in result.rejected] == [3, 4, 5, 6], "Invalid rows should be rejected with line numbers"
+    tables = tables_storage.get_tables_for_date(business_date)
+    assert all(table.is_reserved for table in tables), "Both tables should be reserved"
+    assert tables_storage.get_version(business_date) == 1, "Version should be bumped once per date"
+    result = tables_storage.import_reservations(rows[:1])
+    assert result.accepted == 0 and "already reserved" in result.rejected[0][1]
+
+
+def test_import_reservations_in_past_time(tables_storage: TablesStorage):
+    today = date(2030, 1, 1)
+    now = datetime(2030, 1, 1, 15)
+    rows = [{"date": "01.01.2030", "table_id": "1", "booking_time": "10:00", "user_name": "Name"},
+            {"date": "01.01.2030", "table_id": "2", "booking_time": "19:00", "user_name": "Name"}]
+    result = tables_storage.import_reservations(rows, today=today, now=now)
+    assert result.accepted == 1, "Booking for later today should be accepted"
+    assert result.rejected == [(2, "time is in the past")], "Booking for earlier today should be rejected"
+
+
+def test_reload_tables(tables_storage: TablesStorage):
+    yesterday = date.today() - timedelta(days=1)
+    business_date = date.today() + timedelta(days=1)
+    tables_storage.get_tables_for_date(yesterday)
+    tables = tables_storage.get_tables_for_date(business_date)
+    reserved_table = tables_storage.search_for_table(2, tables)
+    tables_storage.reserve_table(reserved_table, user_name="Name")
+    result = tables_storage.reload_tables(({"table_number": "1", "capacity": "6"},
+                                           {"table_number": "3", "capacity": "2"}))
+    assert (result.added, result.removed, result.resized) == ([3], [2], [1])
+    assert result.orphaned == [reserved_table], "Reserved removed table should be reported"
+    tables = tables_storage.get_tables_for_date(business_date)
+    assert sorted(table.table_id for table in tables) == [1, 2, 3], "Reserved table should be kept"
+    assert tables_storage.search_for_table(6, tables).table_id == 1, "Capacity should be updated"
+    past_capacities = {table.table_id: table.capacity for table in tables_storage.get_tables_for_date(yesterday)}
+    assert past_capacities == {1: 4, 2: 2}, "Past dates should not be changed"
+    tables_storage.release_table(reserved_table)
+    tables = tables_storage.get_tables_for_date(business_date)
+    assert sorted(table.table_id for table in tables) == [1, 3], "Removed table should be dropped after cancellation"
+
+    # removed reserved table is added back
+    tables_storage.reserve_table(tables_storage.search_for_table(2, tables), user_name="Name")
+    reserved_table = next(table for table in tables if table.is_reserved and table.table_id == 3)
+    tables_storage.reload_tables(({"table_number": "1", "capacity": "6"},))
+    result = tables_storage.reload_tables(({"table_number": "1", "capacity": "6"},
+                                           {"table_number": "3", "capacity": "4"}))
+    assert result.added == [3] and not result.orphaned
+    tables = tables_storage.get_tables_for_date(business_date)
+    assert [(table.table_id, table.is_reserved) for table in tables] == [(1, False), (3, True)], \
+        "Table added back should not be duplicated"
+    assert reserved_table.capacity == 4, "Capacity of kept table should be updated"
+
+
+def test_failed_reload_keeps_tables(tables_storage: TablesStorage):
+    business_date = date.today() + timedelta(days=1)
+    tables_before = [(table.table_id, table.capacity) for table in tables_storage.get_tables_for_date(business_date)]
+    with pytest.raises(ValueError):
+        tables_storage.reload_tables(({"table_number": "1", "capacity": "4"},
+                                      {"table_number": "3", "capacity": "abc"}))
+    tables = tables_storage.get_tables_for_date(business_date)
+    assert [(table.table_id, table.capacity) for table in tables] == tables_before, "Dates should not be changed"
+    new_date = business_date + timedelta(days=1)
+    assert len(tables_storage.get_tables_for_date(new_date)) == 2, "New dates should use previous floor plan"
+    assert tables_storage.get_free_capacity(new_date) == 4
+
+
+def test_imported_booking_without_time_is_restored(tables_distribution_csv_file: str, backup_csv_file: str):
+    tables_storage = TablesStorage.from_csv_file(tables_distribution_csv_file)
+    business_date = date.today() + timedelta(days=1)
+    rows = [{"date": business_date.strftime("%d.%m.%Y"), "table_id": "1", "booking_time": "", "user_name": "Name"}]
+    assert tables_storage.import_reservations(rows).accepted == 1
+    tables_storage.backup_to_csv_file(backup_csv_file)
+    tables_storage = TablesStorage.from_csv_file(tables_distribution_csv_file)
+    tables_storage.upload_backup_file(backup_csv_file)
+    table = next(table for table in tables_storage.get_tables_for_date(business_date) if table.table_id == 1)
+    assert table.is_reserved and table.user_name == "Name", "Imported booking should be restored"
+    assert table.readable_booking_time == "N/A", "Booking without time should be restored without time"
@@ -0,0 +1,51 @@
+import pytest
+
+from throttling import DEFAULT_COMMAND_COSTS, RateLimiter, RecentIds, parse_costs
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_recent_ids():
+    recent_ids = RecentIds(maxsize=2)
+    assert recent_ids.add(1) and recent_ids.add(2), "New ids should be accepted"
+    assert not recent_ids.add(1), "Duplicated id should be detected"
+    assert recent_ids.add(3) and len(recent_ids) == 2, "Size should be bounded"
+    assert recent_ids.add(2), "The oldest id should be forgotten"
+
+
+def test_rate_limiter():
+    clock = FakeClock()
+    limiter = RateLimiter(capacity=4, refill_rate=1, costs={"availabletables": 2}, clock=clock)
+    assert limiter.allow(1, "availabletables") and limiter.allow(1, "availabletables")
+    assert not limiter.allow(1, None), "Bucket should be empty"
+    assert limiter.should_notify(1), "User should be notified once"
+    assert not limiter.allow(1, None) and not limiter.should_notify(1), "User should not be notified twice"
+    assert limiter.allow(2, "availabletables"), "Other users should not be affected"
+    clock.now = 1
+    assert limiter.allow(1, None), "Bucket should be refilled"
+    assert not limiter.allow(1, None)
+    assert limiter.should_notify(1), "User should be notified again after being allowed"
+
+
+def test_parse_costs():
+    assert parse_costs("allbookings=5, /Export=3") == {"allbookings": 5, "export": 3}
+    assert parse_costs(None) == {}
+    with pytest.raises(ValueError):
+        parse_costs("export")
+
+
+def test_rate_limiter_from_env(monkeypatch):
+    monkeypatch.setenv("THROTTLE_CAPACITY", "3")
+    monkeypatch.setenv("THROTTLE_COMMAND_COSTS", "mybookings=2")
+    limiter = RateLimiter.from_env()
+    assert limiter.get_cost("mybookings") == 2, "Cost from environment should be used"
+    assert limiter.get_cost("allbookings") == DEFAULT_COMMAND_COSTS["allbookings"], "Default costs should be kept"
+    assert limiter.allow(1, "mybookings") and not limiter.allow(1, "mybookings"), "Capacity should be used"
+
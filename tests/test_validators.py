@@ -0,0 +1,26 @@
+import asyncio
+from datetime import date, datetime
+
+from exporters import EXPORT_FORMATS
+from validators import validate_export_options
+
+
+def test_validate_export_options():
+    year = datetime.now().year
+    options, _ = asyncio.run(validate_export_options("ics 01.03 10.03", EXPORT_FORMATS))
+    assert options == ("ics", date(year, 3, 1), date(year, 3, 10))
+    options, _ = asyncio.run(validate_export_options(None, EXPORT_FORMATS))
+    assert options == ("csv", datetime.now().date(), None), "Export from today in csv should be default"
+
+
+def test_export_range_crosses_new_year():
+    year = datetime.now().year
+    options, _ = asyncio.run(validate_export_options("20.12 10.01", EXPORT_FORMATS))
+    assert options == ("csv", date(year, 12, 20), date(year + 1, 1, 10)), "End date should be in the next year"
+
+
+def test_unknown_export_format():
+    options, text = asyncio.run(validate_export_options("pdf", EXPORT_FORMATS))
+    assert options is None and "csv|ics" in text, "Unknown format should be rejected with known formats"
+    options, text = asyncio.run(validate_export_options("31.02", EXPORT_FORMATS))
+    assert options is None and "Invalid format for date" in text
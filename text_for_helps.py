@@ -7,6 +7,7 @@ There are the following command allowed to use:
 
 /booktable - to book a table for specific date (e.g. in the future or today)
 /booktabletoday - to book a table for today only
+/quickbook - to book a table choosing date, seats and time with buttons
 
 NOTE. you need a table number for these commands
 /cancelreservation - to cancel reservation for a table (for any date). 
@@ -30,9 +31,12 @@ manager_help = f"""
 /checkbookings - check all bookings for specific date
 /checkbookingstoday - to check all bookings for today
 /allbookings - to check all bookings for all dates
+/export - to get bookings as file, e.g. /export ics 01.11 30.11 (format csv or ics, dates are optional)
 
 /bookbynumber - to book a table by number for today only
 /forcebooking - to book a table for for today by number without name and time
+/importbookings - to book tables for any dates from csv file
 
 /backupreservations - to backup all reservations to file
+/reloadtables - to apply changed tables distribution file without restart
 """
\ No newline at end of file
@@ -0,0 +1,153 @@
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+# cost of commands for rate limiter, commands which scan storage are more expensive
+DEFAULT_COMMAND_COSTS = {
+    "availabletables": 2,
+    "availabletablestoday": 2,
+    "checkbookings": 2,
+    "checkbookingstoday": 2,
+    "mybookings": 3,
+    "allbookings": 5,
+    "export": 5,
+    "importbookings": 5,
+}
+DEFAULT_COST = 1
+DEFAULT_CAPACITY = 10
+DEFAULT_REFILL_RATE = 1
+
+
+def parse_costs(value: Optional[str]) -> Dict[str, float]:
+    """
+    Parse costs of commands separated by commas or spaces, e.g. 'allbookings=5, export=3'
+    :param value:
+    :return:
+    """
+    costs = {}
+    for item in re.split(r"[,\s]+", value or ""):
+        if not item:
+            continue
+        command, separator, cost = item.partition("=")
+        if not separator:
+            raise ValueError(f"Cost of command should be given as command=cost, got: {item}")
+        costs[command.lstrip("/").lower()] = float(cost)
+    return costs
+
+
+class RecentIds:
+    """
+    Bounded set of recently seen ids, the oldest ids are forgotten when it is full
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self._maxsize = maxsize
+        self._ids: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, item: Hashable) -> bool:
+        """
+        Remember id
+        :param item:
+        :return: False if id is already seen
+        """
+        if item in self._ids:
+            self._ids.move_to_end(item)
+            return False
+        self._ids[item] = None
+        if len(self._ids) > self._maxsize:
+            self._ids.popitem(last=False)
+        return True
+
+
+class TokenBucket:
+
+    def __init__(self, capacity: float, refill_rate: float, now: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.updated_at = now
+
+    def consume(self, cost: float, now: float) -> bool:
+        """
+        Take tokens from bucket if there is enough of them
+        :param cost: number of tokens to take
+        :param now: current time in seconds
+        :return: False if request has to be throttled
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+class RateLimiter:
+    """
+    Token bucket per user. Buckets of users who are not active for long time are dropped
+    when number of users exceeds max_users
+    """
+
+    def __init__(self, capacity: float = DEFAULT_CAPACITY, refill_rate: float = DEFAULT_REFILL_RATE,
+                 max_users: int = 10000,
+                 costs: Optional[Dict[str, float]] = None, clock: Callable[[], float] = time.monotonic):
+        self._capacity = capacity
+        self._refill_rate = refill_rate
+        self._max_users = max_users
+        self._costs = DEFAULT_COMMAND_COSTS if costs is None else costs
+        self._clock = clock
+        self._buckets: OrderedDict = OrderedDict()
+        # users who are already notified about throttling
+        self._notified = set()
+
+    def get_cost(self, command: Optional[str]) -> float:
+        return self._costs.get(command, DEFAULT_COST) if command else DEFAULT_COST
+
+    def allow(self, user_id: Hashable, command: Optional[str] = None) -> bool:
+        """
+        Check if user can make a request
+        :param user_id:
+        :param command: name of command without slash, None for other messages
+        :return:
+        """
+        now = self._clock()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(self._capacity, self._refill_rate, now)
+            self._buckets[user_id] = bucket
+            if len(self._buckets) > self._max_users:
+                dropped_user, _ = self._buckets.popitem(last=False)
+                self._notified.discard(dropped_user)
+        else:
+            self._buckets.move_to_end(user_id)
+        allowed = bucket.consume(self.get_cost(command), now)
+        if allowed:
+            self._notified.discard(user_id)
+        return allowed
+
+    def should_notify(self, user_id: Hashable) -> bool:
+        """
+        Check if throttled user has to be notified, notification is sent once until user is allowed again
+        :param user_id:
+        :return:
+        """
+        if user_id in self._notified:
+            return False
+        self._notified.add(user_id)
+        return True
+
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        """
+        Create limiter from THROTTLE_CAPACITY, THROTTLE_REFILL_RATE and THROTTLE_COMMAND_COSTS environment variables.
+        Costs from THROTTLE_COMMAND_COSTS are added to default costs of commands
+        :return:
+        """
+        return cls(capacity=float(os.getenv("THROTTLE_CAPACITY") or DEFAULT_CAPACITY),
+                   refill_rate=float(os.getenv("THROTTLE_REFILL_RATE") or DEFAULT_REFILL_RATE),
+                   costs={**DEFAULT_COMMAND_COSTS, **parse_costs(os.getenv("THROTTLE_COMMAND_COSTS"))})
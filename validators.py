@@ -31,4 +31,35 @@ async def validate_seats(seats: str) -> Optional[int]:
     if not seats.isdigit():
         _logger.debug(f"Seats should be digit. Got: {seats}")
         return None
-    return int(seats)
\ No newline at end of file
+    return int(seats)
+
+async def validate_export_options(args: Optional[str],
+                                  formats: Tuple[str, ...]) -> Tuple[Optional[Tuple[str, date, Optional[date]]], str]:
+    """
+    Parse options of export command: [format] [start DD.MM] [end DD.MM].
+    Export is done in first format by default, from today and without end date.
+    End date before start date is taken from the next year, e.g. 20.12 10.01
+    """
+    options = args.split() if args else []
+    export_format = formats[0]
+    if options and options[0].lower() in formats:
+        export_format = options.pop(0).lower()
+    elif options and options[0].isalpha():
+        return None, f"Unknown format {options[0]}. Format: {'|'.join(formats)} DD.MM DD.MM"
+    if len(options) > 2:
+        return None, f"Too many options. Format: {'|'.join(formats)} DD.MM DD.MM"
+    current_year = datetime.now().year
+    try:
+        dates = [datetime.strptime(f"{option}.{current_year}", "%d.%m.%Y").date() for option in options]
+    except ValueError:
+        _logger.debug(f"Failed to parse export dates: {options}")
+        return None, "Invalid format for date. Please enter dates in the format DD.MM"
+    start_date = dates[0] if dates else datetime.now().date()
+    end_date = dates[1] if len(dates) > 1 else None
+    if end_date and end_date < start_date:
+        try:
+            end_date = end_date.replace(year=end_date.year + 1)
+        except ValueError:
+            # 29.02 of the next year doesn't exist
+            return None, "Invalid format for date. Please enter dates in the format DD.MM"
+    return (export_format, start_date, end_date), ""